@@ -0,0 +1,56 @@
+"""
+Numba-compiled hearing analysis kernels for the SoundCheck Hearing Test API
+"""
+
+import numpy as np
+from numba import njit, boolean, float64, int64
+
+# Standard PTA frequencies in Hz
+PTA_FREQUENCIES = (500, 1000, 2000, 4000)
+
+# Estimated thresholds in dB HL: heard, and not heard per band (<= 1000, <= 4000, above)
+HEARD_THRESHOLD = 20.0
+NOT_HEARD_BAND_EDGES = (1000, 4000)
+NOT_HEARD_THRESHOLDS = (35.0, 40.0, 45.0)
+
+# Normal hearing threshold in dB HL, used when nothing was tested
+DEFAULT_THRESHOLD = 25.0
+
+@njit(float64[::1](int64[::1], boolean[::1]), cache=True, boundscheck=False)
+def estimate_thresholds(freqs, heard):
+    """Estimated threshold per response from paired frequency / heard arrays"""
+    n = freqs.shape[0]
+    out = np.empty(n, dtype=np.float64)
+
+    for i in range(n):
+        if heard[i]:
+            # If heard, threshold is likely below 25 dB (normal)
+            out[i] = HEARD_THRESHOLD
+        else:
+            # If not heard, use the estimate for the frequency band
+            band = 0
+            while band < len(NOT_HEARD_BAND_EDGES) and freqs[i] > NOT_HEARD_BAND_EDGES[band]:
+                band += 1
+            out[i] = NOT_HEARD_THRESHOLDS[band]
+    return out
+
+@njit(float64(int64[::1], float64[::1]), cache=True, boundscheck=False)
+def pure_tone_average(freqs, values):
+    """Mean threshold over the PTA frequencies, else over all frequencies"""
+    n = freqs.shape[0]
+    pta_total = 0.0
+    pta_count = 0
+    total = 0.0
+
+    for i in range(n):
+        total += values[i]
+        if freqs[i] in PTA_FREQUENCIES:
+            pta_total += values[i]
+            pta_count += 1
+
+    if pta_count:
+        return pta_total / pta_count
+    # Fallback: use all available frequencies
+    if n:
+        return total / n
+    return DEFAULT_THRESHOLD
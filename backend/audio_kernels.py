@@ -0,0 +1,35 @@
+"""
+Numba-compiled audio synthesis kernels for the SoundCheck Hearing Test API
+"""
+
+import math
+import numpy as np
+from numba import njit, float32, int16, int64
+
+# Samples between exact sin() reseeds of the recurrence, bounds accumulated drift
+RESEED_INTERVAL = 4096
+
+# Full-scale amplitude of 16-bit PCM
+INT16_MAX = 32767
+
+@njit(int16[:](float32, float32, float32, int64), cache=True, fastmath=True, boundscheck=False)
+def gen_sine(freq, duration, volume, sr):
+    """Fill an int16 PCM buffer with a sine tone of the given amplitude (0-1)"""
+    n = int(duration * sr)
+    out = np.empty(n, dtype=np.int16)
+    step = 2.0 * math.pi * freq / sr
+    c = 2.0 * math.cos(step)
+    gain = volume * INT16_MAX
+
+    # s[i] = 2*cos(w)*s[i-1] - s[i-2], reseeded from sin() at the start of each block
+    for start in range(0, n, RESEED_INTERVAL):
+        end = min(start + RESEED_INTERVAL, n)
+        s0 = math.sin(step * (start - 1))
+        s1 = math.sin(step * start)
+        out[start] = np.int16(gain * s1)
+        for i in range(start + 1, end):
+            s2 = c * s1 - s0
+            out[i] = np.int16(gain * s2)
+            s0 = s1
+            s1 = s2
+    return out
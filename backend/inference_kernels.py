@@ -0,0 +1,41 @@
+"""
+Numba-compiled inference kernels for the SoundCheck Hearing Test API
+"""
+
+import math
+import numpy as np
+from numba import njit, float32, float64
+
+# Compiled for double and single precision inputs (weights must match the input dtype)
+SIGNATURES = [
+    float64[:, ::1](float64[:, ::1], float64[:, ::1], float64[::1]),
+    float32[:, ::1](float32[:, ::1], float32[:, ::1], float32[::1]),
+]
+
+@njit(SIGNATURES, cache=True, fastmath=True, boundscheck=False)
+def softmax_scores(X, W, b):
+    """Class probabilities of a fused multinomial logistic regression, one row per input"""
+    n_samples, n_features = X.shape
+    n_classes = W.shape[0]
+    out = np.empty((n_samples, n_classes), dtype=X.dtype)
+
+    for i in range(n_samples):
+        # logits[c] = b[c] + sum_j W[c, j] * x[j]
+        max_logit = -np.inf
+        for c in range(n_classes):
+            logit = b[c]
+            for j in range(n_features):
+                logit += W[c, j] * X[i, j]
+            out[i, c] = logit
+            if logit > max_logit:
+                max_logit = logit
+
+        # Numerically stable softmax
+        total = 0.0
+        for c in range(n_classes):
+            p = math.exp(out[i, c] - max_logit)
+            out[i, c] = p
+            total += p
+        for c in range(n_classes):
+            out[i, c] /= total
+    return out
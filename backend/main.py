@@ -3,23 +3,34 @@ SoundCheck - ML-Powered Hearing Test Backend
 FastAPI application for the hackathon hearing test project
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import uvicorn
+import argparse
+import asyncio
+import hashlib
+import orjson
+import os
+import sys
 import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlencode
 import logging
-from typing import Dict, Any
+from typing import Annotated, Dict, Any, Tuple
 
 # Import our models and utilities
 from models import (
     HearingTestRequest, HearingTestResponse, HearingTestResult,
-    AudioGenerationRequest, AudioResponse, HealthStatus, ModelInfo,
+    AudioGenerationRequest, AudioResponse, AudioBatchRequest, AudioBatchResponse,
+    HealthStatus, ModelInfo,
     HearingCategory, FrequencyThreshold, TestStatistics
 )
 from utils import (
-    get_model_manager, AudioGenerator, HearingAnalyzer
+    get_model_manager, AudioGenerator, HearingAnalyzer, InferenceBatcher,
+    TEST_FREQUENCIES
 )
 
 # Set up logging
@@ -32,7 +43,8 @@ app = FastAPI(
     description="ML-Powered Hearing Test Backend for Hackathon",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -48,6 +60,14 @@ app.add_middleware(
 model_manager = get_model_manager()
 audio_generator = AudioGenerator()
 hearing_analyzer = HearingAnalyzer()
+inference_batcher = InferenceBatcher(model_manager)
+
+# Streamed tones never change for a given URL, so browsers and CDNs may keep them
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Rule-based PTA category boundaries in dB HL (upper bound inclusive)
+_PTA_BINS = np.array([25, 40, 60, 80])
+_PTA_LABELS = ("Normal", "Mild", "Moderate", "Severe", "Profound")
 
 @app.on_event("startup")
 async def startup_event():
@@ -59,8 +79,23 @@ async def startup_event():
         logger.error("Failed to load ML model!")
         raise RuntimeError("ML model not loaded")
     
+    # Dedicated pool for blocking model / synthesis work, keeps the event loop responsive
+    app.state.infer_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+    
+    # Start the micro-batching inference worker
+    inference_batcher.start(app.state.infer_pool)
+    
+    # Warm up the inference path (BLAS / Numba first-call cost) before the first request
+    model_manager.warmup()
+    
     logger.info("SoundCheck API started successfully!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background resources"""
+    await inference_batcher.stop()
+    app.state.infer_pool.shutdown(wait=False)
+
 @app.get("/", response_model=Dict[str, str])
 async def root():
     """Root endpoint"""
@@ -95,25 +130,29 @@ async def get_model_info():
         training_date=datetime.now().isoformat()
     )
 
-@app.post("/audio/generate", response_model=AudioResponse)
+def _stream_url(request: AudioGenerationRequest) -> str:
+    """Path of a tone on the raw WAV stream endpoint"""
+    return f"{app.url_path_for('stream_audio_tone')}?{urlencode(request.model_dump(exclude_none=True))}"
+
+@app.post("/audio/generate", response_model=AudioResponse, deprecated=True)
 async def generate_audio_tone(request: AudioGenerationRequest):
-    """Generate an audio tone for hearing testing"""
+    """Generate an audio tone for hearing testing (deprecated: use /audio/stream)"""
     try:
-        # Generate the tone
-        tone = audio_generator.generate_sine_tone(
-            frequency=request.frequency,
-            duration=request.duration,
-            volume=request.volume,
-            sample_rate=request.sample_rate
+        # Generate the tone as base64 off the event loop (served from cache for repeated requests)
+        audio_base64 = await asyncio.get_running_loop().run_in_executor(
+            app.state.infer_pool,
+            audio_generator.render_base64,
+            request.frequency,
+            request.duration,
+            request.volume,
+            request.sample_rate
         )
         
-        # Convert to base64
-        audio_base64 = audio_generator.tone_to_base64(tone)
-        
         return AudioResponse(
             success=True,
             message=f"Generated {request.frequency}Hz tone",
             audio_data=audio_base64,
+            audio_url=_stream_url(request),
             content_type="audio/wav"
         )
         
@@ -121,6 +160,69 @@ async def generate_audio_tone(request: AudioGenerationRequest):
         logger.error(f"Error generating audio: {e}")
         raise HTTPException(status_code=500, detail=f"Audio generation failed: {str(e)}")
 
+@app.post("/audio/generate/batch", response_model=AudioBatchResponse)
+async def generate_audio_batch(request: AudioBatchRequest):
+    """Generate several audio tones in one round trip, e.g. every test frequency up front"""
+    try:
+        # Render the tones concurrently off the event loop (each served from cache when repeated)
+        loop = asyncio.get_running_loop()
+        audio_base64 = await asyncio.gather(*(
+            loop.run_in_executor(
+                app.state.infer_pool,
+                audio_generator.render_base64,
+                tone.frequency,
+                tone.duration,
+                tone.volume,
+                tone.sample_rate
+            )
+            for tone in request.tones
+        ))
+        
+        return AudioBatchResponse(
+            success=True,
+            message=f"Generated {len(request.tones)} tones",
+            tones=[
+                AudioResponse(
+                    success=True,
+                    message=f"Generated {tone.frequency}Hz tone",
+                    audio_data=audio_data,
+                    audio_url=_stream_url(tone),
+                    content_type="audio/wav"
+                )
+                for tone, audio_data in zip(request.tones, audio_base64)
+            ]
+        )
+        
+    except Exception as e:
+        logger.error(f"Error generating audio batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Audio generation failed: {str(e)}")
+
+@app.get("/audio/stream")
+async def stream_audio_tone(request: Annotated[AudioGenerationRequest, Query()]):
+    """Stream an audio tone as raw WAV bytes, usable directly as an <audio> source"""
+    try:
+        header, pcm = await asyncio.get_running_loop().run_in_executor(
+            app.state.infer_pool,
+            audio_generator.render_wav,
+            request.frequency,
+            request.duration,
+            request.volume,
+            request.sample_rate
+        )
+    except Exception as e:
+        logger.error(f"Error generating audio: {e}")
+        raise HTTPException(status_code=500, detail=f"Audio generation failed: {str(e)}")
+    
+    return StreamingResponse(
+        iter((header, pcm)),
+        media_type="audio/wav",
+        headers={
+            "Content-Length": str(len(header) + len(pcm)),
+            # A tone is fully determined by its query parameters
+            "Cache-Control": AUDIO_CACHE_CONTROL
+        }
+    )
+
 @app.post("/test/analyze", response_model=HearingTestResponse)
 async def analyze_hearing_test(request: HearingTestRequest):
     """Analyze hearing test results and provide ML-based assessment"""
@@ -130,34 +232,32 @@ async def analyze_hearing_test(request: HearingTestRequest):
         
         logger.info(f"Analyzing hearing test {test_id}")
         
+        # Convert responses to paired arrays once for all per-frequency math
+        responses = request.frequency_responses
+        total_frequencies = len(responses)
+        freqs, heard = hearing_analyzer.pack_responses(responses)
+        
         # Estimate thresholds from responses
-        thresholds = hearing_analyzer.estimate_thresholds(request.frequency_responses)
+        threshold_values = hearing_analyzer.threshold_values(freqs, heard)
+        thresholds = hearing_analyzer.thresholds_by_frequency(freqs, threshold_values)
         
         # Calculate PTA (Pure-Tone Average)
-        pta = hearing_analyzer.calculate_pta(thresholds)
+        pta = hearing_analyzer.calculate_pta_from_arrays(freqs, threshold_values)
         
         # Make ML prediction
         try:
-            prediction, confidence = model_manager.predict(thresholds)
+            prediction, confidence = await inference_batcher.submit(thresholds)
         except Exception as e:
             logger.error(f"Model prediction failed: {e}")
             # Fallback to rule-based classification
-            if pta <= 25:
-                prediction = "Normal"
-            elif pta <= 40:
-                prediction = "Mild"
-            elif pta <= 60:
-                prediction = "Moderate"
-            else:
-                prediction = "Severe"
+            prediction = _PTA_LABELS[np.searchsorted(_PTA_BINS, pta)]
             confidence = 0.7
         
         # Get recommendations
         recommendations = hearing_analyzer.get_recommendations(prediction, pta)
         
         # Calculate additional risk factors
-        frequencies_not_heard = len([r for r in request.frequency_responses if not r.heard])
-        total_frequencies = len(request.frequency_responses)
+        frequencies_not_heard = int(total_frequencies - heard.sum())
 
         # Assess risk level with simplified logic
         risk_level = hearing_analyzer.assess_risk_level(
@@ -172,8 +272,8 @@ async def analyze_hearing_test(request: HearingTestRequest):
         frequency_analysis = {
             "thresholds": thresholds,
             "pta": pta,
-            "frequencies_tested": [r.frequency for r in request.frequency_responses],
-            "frequencies_heard": [r.frequency for r in request.frequency_responses if r.heard]
+            "frequencies_tested": freqs.tolist(),
+            "frequencies_heard": freqs[heard].tolist()
         }
         
         # Create result
@@ -202,50 +302,70 @@ async def analyze_hearing_test(request: HearingTestRequest):
             error_details=str(e)
         )
 
+# Static payloads are serialized once; clients and proxies may cache them for a day
+STATIC_CACHE_CONTROL = "public, max-age=86400, immutable"
+
+def _prebuild_json(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Serialize a static payload once and derive its ETag"""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.sha256(body).hexdigest()}"'
+
+def _static_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Return prebuilt JSON bytes, or 304 when the client already has this version"""
+    headers = {"Cache-Control": STATIC_CACHE_CONTROL, "ETag": etag}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+_FREQUENCIES_JSON, _FREQUENCIES_ETAG = _prebuild_json({
+    "frequencies": TEST_FREQUENCIES,
+    "description": "Standard audiometric frequencies in Hz",
+    "pta_frequencies": [500, 1000, 2000, 4000],
+    "pta_description": "Frequencies used for Pure-Tone Average calculation"
+})
+
+_CATEGORIES_JSON, _CATEGORIES_ETAG = _prebuild_json({
+    "categories": {
+        "Normal": {
+            "range": "≤ 25 dB HL",
+            "description": "No hearing loss"
+        },
+        "Mild": {
+            "range": "26-40 dB HL", 
+            "description": "Mild hearing loss"
+        },
+        "Moderate": {
+            "range": "41-60 dB HL",
+            "description": "Moderate hearing loss"
+        },
+        "Severe": {
+            "range": "61-80 dB HL",
+            "description": "Severe hearing loss"
+        },
+        "Profound": {
+            "range": "> 80 dB HL",
+            "description": "Profound hearing loss"
+        }
+    },
+    "note": "Classifications based on WHO standards"
+})
+
 @app.get("/test/frequencies")
-async def get_test_frequencies():
+async def get_test_frequencies(request: Request):
     """Get the standard frequencies used for hearing testing"""
-    return {
-        "frequencies": [500, 1000, 2000, 3000, 4000, 6000, 8000],
-        "description": "Standard audiometric frequencies in Hz",
-        "pta_frequencies": [500, 1000, 2000, 4000],
-        "pta_description": "Frequencies used for Pure-Tone Average calculation"
-    }
+    return _static_json_response(request, _FREQUENCIES_JSON, _FREQUENCIES_ETAG)
 
 @app.get("/categories")
-async def get_hearing_categories():
+async def get_hearing_categories(request: Request):
     """Get hearing loss categories and their descriptions"""
-    return {
-        "categories": {
-            "Normal": {
-                "range": "≤ 25 dB HL",
-                "description": "No hearing loss"
-            },
-            "Mild": {
-                "range": "26-40 dB HL", 
-                "description": "Mild hearing loss"
-            },
-            "Moderate": {
-                "range": "41-60 dB HL",
-                "description": "Moderate hearing loss"
-            },
-            "Severe": {
-                "range": "61-80 dB HL",
-                "description": "Severe hearing loss"
-            },
-            "Profound": {
-                "range": "> 80 dB HL",
-                "description": "Profound hearing loss"
-            }
-        },
-        "note": "Classifications based on WHO standards"
-    }
+    return _static_json_response(request, _CATEGORIES_JSON, _CATEGORIES_ETAG)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -255,10 +375,26 @@ async def global_exception_handler(request, exc):
     )
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    parser = argparse.ArgumentParser(description="Run the SoundCheck API server")
+    parser.add_argument("--dev", action="store_true", help="Enable auto-reload with a single worker")
+    args = parser.parse_args()
+    
+    if args.dev:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="asyncio" if sys.platform == "win32" else "uvloop",  # uvloop is not available on Windows
+            http="httptools",
+            workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+            reload=False,
+            log_level="info"
+        )
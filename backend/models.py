@@ -2,10 +2,14 @@
 Pydantic models for the SoundCheck Hearing Test API
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
+# Output sample rates in Hz; tones default to the lowest with 4 samples per cycle,
+# well above Nyquist (2), so an 8 kHz tone plays at 32 kHz instead of 44.1 kHz
+STANDARD_SAMPLE_RATES = (8000, 16000, 22050, 32000, 44100, 48000)
+
 class HearingCategory(str, Enum):
     """Hearing loss categories based on WHO classification"""
     NORMAL = "Normal"
@@ -31,7 +35,7 @@ class HearingTestRequest(BaseModel):
     frequency_responses: List[FrequencyResponse] = Field(
         ..., 
         description="List of frequency test responses",
-        min_items=1
+        min_length=1
     )
     test_id: Optional[str] = Field(None, description="Unique test identifier")
 
@@ -57,15 +61,39 @@ class AudioGenerationRequest(BaseModel):
     frequency: int = Field(..., ge=20, le=20000, description="Frequency in Hz")
     duration: float = Field(1.0, ge=0.1, le=10.0, description="Duration in seconds")
     volume: float = Field(0.5, ge=0.0, le=1.0, description="Volume level (0-1)")
-    sample_rate: int = Field(44100, description="Sample rate in Hz")
+    sample_rate: Optional[int] = Field(None, ge=8000, le=48000, description="Sample rate in Hz, one of the standard rates (defaults to the lowest suited to the frequency)")
+
+    @field_validator("sample_rate")
+    @classmethod
+    def check_sample_rate(cls, value: Optional[int]) -> Optional[int]:
+        """Only standard rates, so a request cannot size the synthesized buffer arbitrarily"""
+        if value is not None and value not in STANDARD_SAMPLE_RATES:
+            raise ValueError(f"sample_rate must be one of {STANDARD_SAMPLE_RATES}")
+        return value
 
 class AudioResponse(BaseModel):
     """Response for audio generation"""
     success: bool
     message: str
     audio_data: Optional[str] = Field(None, description="Base64 encoded audio data")
+    audio_url: Optional[str] = Field(None, description="Path of the same tone on the raw WAV stream endpoint")
     content_type: str = Field("audio/wav", description="Audio MIME type")
 
+class AudioBatchRequest(BaseModel):
+    """Request for generating several audio tones in one call"""
+    tones: List[AudioGenerationRequest] = Field(
+        ...,
+        description="Tones to generate",
+        min_length=1,
+        max_length=32
+    )
+
+class AudioBatchResponse(BaseModel):
+    """Response for batch audio generation"""
+    success: bool
+    message: str
+    tones: List[AudioResponse] = Field(..., description="Generated tones, in request order")
+
 class HealthStatus(BaseModel):
     """API health status"""
     status: str
@@ -2,6 +2,9 @@
 Utility functions for the SoundCheck Hearing Test API
 """
 
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 from scipy import signal
@@ -9,219 +12,516 @@ from pydub import AudioSegment
 from pydub.generators import Sine
 import base64
 import io
+import math
+import struct
+import threading
 import joblib
+from sklearn.linear_model import LogisticRegression
 import os
 from typing import List, Dict, Tuple, Optional
-from models import FrequencyResponse, HearingCategory, FrequencyThreshold
+from models import FrequencyResponse, HearingCategory, FrequencyThreshold, STANDARD_SAMPLE_RATES
+import analysis_kernels
+from audio_kernels import gen_sine
+from inference_kernels import softmax_scores
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Standard audiometric test frequencies in Hz
+TEST_FREQUENCIES = [500, 1000, 2000, 3000, 4000, 6000, 8000]
+
+# Raised-cosine onset/offset ramp in ms, the audiometric convention that avoids edge clicks
+RAMP_MS = 5.0
+
+# Tones default to the lowest standard sample rate giving this many samples per cycle
+SAMPLES_PER_CYCLE = 4
+
+# (duration, volume) pairs prebuilt at import: API defaults and the frontend test settings
+PRELOAD_TONE_SETTINGS = [(1.0, 0.5), (3.0, 0.6)]
+
 class ModelManager:
     """Manages the ML model loading and predictions"""
     
-    def __init__(self, model_dir: str = "models"):
+    def __init__(self, model_dir: str = "models", dtype: str = "float64"):
         self.model_dir = model_dir
+        # Inference precision; float32 halves the bytes moved but shifts confidences by ~1e-6
+        self.dtype = np.dtype(dtype)
         self.model = None
-        self.scaler = None
+        # StandardScaler statistics, applied as (x - mean) / scale
+        self.scaler_mean = None
+        self.scaler_scale = None
         self.feature_names = None
+        # Response keys in feature order (e.g. "500_avg" -> "500") and the default-filled row
+        self._feature_keys = ()
+        self._default_row = None
+        # Per-thread scratch feature rows, reused across predictions
+        self._local = threading.local()
         self.metadata = None
+        # Scaler folded into the linear model weights (multinomial logistic regression only)
+        self.fused_weights = None
+        self.fused_bias = None
         self.load_model()
     
     def load_model(self):
         """Load the trained ML model and artifacts"""
         try:
-            # Load model metadata
-            metadata_path = os.path.join(self.model_dir, "model_metadata.joblib")
-            if os.path.exists(metadata_path):
-                self.metadata = joblib.load(metadata_path)
-                logger.info(f"Loaded model metadata: {self.metadata['model_name']}")
-            
-            # Load the model
-            model_name = self.metadata['model_name'].lower().replace(" ", "") if self.metadata else "logisticregression"
-            model_path = os.path.join(self.model_dir, f"hearing_classifier_{model_name}.joblib")
+            # List the model directory once instead of stat-ing each artifact
+            with os.scandir(self.model_dir) as entries:
+                present = {entry.name for entry in entries}
             
-            if os.path.exists(model_path):
-                self.model = joblib.load(model_path)
-                logger.info(f"Loaded model from: {model_path}")
-            else:
-                raise FileNotFoundError(f"Model file not found: {model_path}")
-            
-            # Load scaler if it exists
-            scaler_path = os.path.join(self.model_dir, "scaler.joblib")
-            if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
-                logger.info("Loaded scaler")
+            # Feature names are independent of the other artifacts, read them concurrently
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                feature_path = os.path.join(self.model_dir, "feature_names.joblib")
+                feature_future = pool.submit(joblib.load, feature_path) if "feature_names.joblib" in present else None
+                
+                # Load model metadata
+                metadata_path = os.path.join(self.model_dir, "model_metadata.joblib")
+                if "model_metadata.joblib" in present:
+                    self.metadata = joblib.load(metadata_path)
+                    logger.info(f"Loaded model metadata: {self.metadata['model_name']}")
+                
+                # Load the model
+                model_name = self.metadata['model_name'].lower().replace(" ", "") if self.metadata else "logisticregression"
+                model_file = f"hearing_classifier_{model_name}.joblib"
+                model_path = os.path.join(self.model_dir, model_file)
+                
+                if model_file in present:
+                    # Memory-map the model arrays so forked workers share one page-cached copy
+                    self.model = joblib.load(model_path, mmap_mode='r')
+                    logger.info(f"Loaded model from: {model_path}")
+                else:
+                    raise FileNotFoundError(f"Model file not found: {model_path}")
+                
+                # Scaler statistics are stored in the metadata; standalone artifacts ship scaler.npz or a pickled scaler
+                if self.metadata and 'scaler_mean' in self.metadata:
+                    self.scaler_mean = np.asarray(self.metadata['scaler_mean'], dtype=self.dtype)
+                    self.scaler_scale = np.asarray(self.metadata['scaler_scale'], dtype=self.dtype)
+                    logger.info("Loaded scaler statistics from metadata")
+                elif "scaler.npz" in present:
+                    # Plain arrays, loaded without unpickling
+                    with np.load(os.path.join(self.model_dir, "scaler.npz")) as scaler:
+                        self.scaler_mean = np.asarray(scaler['mean'], dtype=self.dtype)
+                        self.scaler_scale = np.asarray(scaler['scale'], dtype=self.dtype)
+                    logger.info("Loaded scaler statistics from scaler.npz")
+                else:
+                    scaler_path = os.path.join(self.model_dir, "scaler.joblib")
+                    if "scaler.joblib" in present:
+                        scaler = joblib.load(scaler_path)
+                        self.scaler_mean = np.asarray(scaler.mean_, dtype=self.dtype)
+                        self.scaler_scale = np.asarray(scaler.scale_, dtype=self.dtype)
+                        logger.info("Loaded scaler")
             
             # Load feature names
-            feature_path = os.path.join(self.model_dir, "feature_names.joblib")
-            if os.path.exists(feature_path):
-                self.feature_names = joblib.load(feature_path)
+            if feature_future is not None:
+                self.feature_names = feature_future.result()
                 logger.info(f"Loaded feature names: {self.feature_names}")
+                
+                # Resolve feature names to response keys once, not per prediction
+                self._feature_keys = tuple(name.replace("_avg", "") for name in self.feature_names)
+                # Untested frequencies default to a normal hearing threshold
+                self._default_row = np.full(len(self._feature_keys), 25.0, dtype=self.dtype)
+            
+            # Report skipped optional artifacts once
+            missing = [name for name in ("model_metadata.joblib", "feature_names.joblib") if name not in present]
+            if missing:
+                logger.warning(f"Model artifacts not found in {self.model_dir}: {', '.join(missing)}")
+            
+            self._fuse_scaler()
             
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
     
+    def _fuse_scaler(self):
+        """Fold the scaler into the logistic regression so inference is a single matmul"""
+        # Other model types keep using sklearn directly
+        if not isinstance(self.model, LogisticRegression):
+            return
+        
+        coef = self.model.coef_
+        intercept = self.model.intercept_
+        if len(self.model.classes_) == 2:
+            # Binary: predict_proba is [1 - sigmoid(z), sigmoid(z)], i.e. a softmax over logits [0, z]
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.0], intercept])
+        elif self.model.get_params().get('multi_class') == 'ovr' or self.model.solver == 'liblinear':
+            # One-vs-rest probabilities are normalized sigmoids, not a softmax
+            return
+        
+        weights = coef
+        bias = intercept
+        if self.scaler_mean is not None:
+            # (x - mean) / scale @ coef.T + b  ==  x @ (coef / scale).T + (b - coef @ (mean / scale))
+            weights = coef / self.scaler_scale
+            bias = bias - (coef * (self.scaler_mean / self.scaler_scale)).sum(axis=1)
+        
+        self.fused_weights = np.ascontiguousarray(weights, dtype=self.dtype)
+        self.fused_bias = np.ascontiguousarray(bias, dtype=self.dtype)
+        logger.info("Fused scaler into model weights")
+    
     def is_loaded(self) -> bool:
         """Check if model is properly loaded"""
         return self.model is not None and self.feature_names is not None
     
+    def warmup(self, batch_size: int = 32):
+        """Run a dummy batch through the model so the first request skips one-time init"""
+        # Empty feature dicts fall back to the default threshold for every frequency
+        self.predict_batch([{}] * batch_size)
+    
+    def _feature_buffer(self, rows: int) -> np.ndarray:
+        """Return this thread's scratch feature array with the given number of rows"""
+        buffer = getattr(self._local, 'features', None)
+        if buffer is None or buffer.shape[0] < rows:
+            # Grown on demand; a C-contiguous row slice is what the compiled scorer expects
+            buffer = np.empty((rows, len(self._feature_keys)), dtype=self.dtype)
+            self._local.features = buffer
+        return buffer[:rows]
+    
     def predict(self, features: Dict[str, float]) -> Tuple[str, float]:
         """Make prediction using the loaded model"""
+        return self.predict_batch([features])[0]
+    
+    def predict_batch(self, features_batch: List[Dict[str, float]]) -> List[Tuple[str, float]]:
+        """Make predictions for several tests with a single model call"""
         if not self.is_loaded():
             raise RuntimeError("Model not loaded")
         
-        # Create feature vector in the correct order
-        feature_vector = []
-        for feature_name in self.feature_names:
-            # Extract frequency from feature name (e.g., "500_avg" -> 500)
-            freq = feature_name.replace("_avg", "")
-            if freq in features:
-                feature_vector.append(features[freq])
-            else:
-                # Use a default threshold if frequency not tested
-                feature_vector.append(25.0)  # Normal hearing threshold
-        
-        # Convert to numpy array and reshape
-        X = np.array(feature_vector).reshape(1, -1)
+        # One default-filled row per test in training feature order, overwritten where tested
+        X = self._feature_buffer(len(features_batch))
+        X[:] = self._default_row
+        for i, features in enumerate(features_batch):
+            row = X[i]
+            for j, key in enumerate(self._feature_keys):
+                value = features.get(key)
+                if value is not None:
+                    row[j] = value
         
-        # Scale if scaler is available
-        if self.scaler:
-            X = self.scaler.transform(X)
+        # Fused path: compiled logits + softmax straight from the folded weights
+        if self.fused_weights is not None:
+            probabilities = softmax_scores(X, self.fused_weights, self.fused_bias)
+            
+            indices = probabilities.argmax(axis=1)
+            predictions = self.model.classes_[indices]
+            confidences = probabilities[np.arange(len(indices)), indices]
+            return [(prediction, float(confidence)) for prediction, confidence in zip(predictions, confidences)]
         
-        # Make prediction
-        prediction = self.model.predict(X)[0]
+        # Scale in place if scaler statistics are available
+        if self.scaler_mean is not None:
+            np.subtract(X, self.scaler_mean, out=X)
+            np.divide(X, self.scaler_scale, out=X)
         
-        # Get confidence score
+        # Labels and confidence scores from one probability call when the model supports it
         if hasattr(self.model, 'predict_proba'):
-            probabilities = self.model.predict_proba(X)[0]
-            confidence = float(np.max(probabilities))
+            probabilities = self.model.predict_proba(X)
+            predictions = self.model.classes_[probabilities.argmax(axis=1)]
+            confidences = probabilities.max(axis=1)
         else:
-            confidence = 0.8  # Default confidence for models without probability
+            predictions = self.model.predict(X)
+            confidences = np.full(len(predictions), 0.8)  # Default confidence for models without probability
+        
+        return [(prediction, float(confidence)) for prediction, confidence in zip(predictions, confidences)]
+
+class InferenceBatcher:
+    """Collects concurrent prediction requests into micro-batches"""
+    
+    def __init__(self, manager: ModelManager, max_batch_size: int = 32, max_delay: float = 0.005):
+        self.manager = manager
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.executor: Optional[Executor] = None
+    
+    def start(self, executor: Optional[Executor] = None):
+        """Start the background batch worker on the running event loop"""
+        # Model calls run on this executor so the event loop stays free (None = loop default)
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._batch_worker())
+    
+    async def stop(self):
+        """Cancel the background batch worker"""
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+    
+    async def submit(self, features: Dict[str, float]) -> Tuple[str, float]:
+        """Queue a prediction and wait for its batched result"""
+        if self.queue is None:
+            raise RuntimeError("Inference batcher not started")
+        
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((future, features))
+        return await future
+    
+    async def _collect_batch(self) -> List[Tuple[asyncio.Future, Dict[str, float]]]:
+        """Wait for one request, then gather more until the batch is full or the delay expires"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_delay
+        
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
         
-        return prediction, confidence
+        return batch
+    
+    async def _batch_worker(self):
+        """Run queued predictions through the model one batch at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            futures = [future for future, _ in batch]
+            
+            try:
+                results = await loop.run_in_executor(
+                    self.executor,
+                    self.manager.predict_batch,
+                    [features for _, features in batch]
+                )
+            except Exception as e:
+                logger.error(f"Batch prediction failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            # Scatter results back to the waiting requests
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
 
 class AudioGenerator:
     """Generates audio tones for hearing tests"""
     
+    @staticmethod
+    def sample_rate_for(frequency: int) -> int:
+        """Lowest standard sample rate giving at least SAMPLES_PER_CYCLE samples per tone cycle"""
+        for rate in STANDARD_SAMPLE_RATES:
+            if rate >= SAMPLES_PER_CYCLE * frequency:
+                return rate
+        return STANDARD_SAMPLE_RATES[-1]
+    
+    @staticmethod
+    def synthesize_pcm(frequency: int, duration: float, volume: float = 0.5,
+                       sample_rate: Optional[int] = None) -> np.ndarray:
+        """Synthesize a ramped sine tone as mono 16-bit PCM samples"""
+        sample_rate = sample_rate or AudioGenerator.sample_rate_for(frequency)
+        # Compiled kernel, volume is a 0-1 amplitude
+        pcm = gen_sine(frequency, duration, volume, sample_rate)
+        return AudioGenerator.apply_ramp(pcm, sample_rate)
+    
+    @staticmethod
+    def apply_ramp(pcm: np.ndarray, sample_rate: int, ramp_ms: float = RAMP_MS) -> np.ndarray:
+        """Taper the onset and offset of a PCM buffer in place with a raised cosine"""
+        n = min(int(sample_rate * ramp_ms / 1000), len(pcm) // 2)
+        if n > 0:
+            ramp = 0.5 - 0.5 * np.cos(np.pi * np.arange(n) / n)
+            pcm[:n] = pcm[:n] * ramp
+            pcm[-n:] = pcm[-n:] * ramp[::-1]
+        return pcm
+    
     @staticmethod
     def generate_sine_tone(frequency: int, duration: float, volume: float = 0.5, 
-                          sample_rate: int = 44100) -> AudioSegment:
+                          sample_rate: Optional[int] = None, use_pydub: bool = False) -> AudioSegment:
         """Generate a sine wave tone"""
         try:
-            # Generate sine wave using pydub
-            tone = Sine(frequency).to_audio_segment(duration=int(duration * 1000))
+            sample_rate = sample_rate or AudioGenerator.sample_rate_for(frequency)
+            
+            if use_pydub:
+                # Legacy pydub generator (slow, unramped)
+                tone = Sine(frequency, sample_rate=sample_rate).to_audio_segment(duration=int(duration * 1000))
+                
+                # Adjust volume (pydub uses dB, convert from 0-1 scale)
+                volume_db = 20.0 * math.log10(max(volume, 0.001))  # Avoid log(0)
+                return tone + volume_db
             
-            # Adjust volume (pydub uses dB, convert from 0-1 scale)
-            volume_db = 20 * np.log10(max(volume, 0.001))  # Avoid log(0)
-            tone = tone + volume_db
+            # Wrap the synthesized samples as mono PCM for export
+            pcm = AudioGenerator.synthesize_pcm(frequency, duration, volume, sample_rate)
+            tone = AudioSegment(
+                data=pcm.tobytes(),
+                sample_width=2,
+                frame_rate=sample_rate,
+                channels=1
+            )
             
             return tone
         except Exception as e:
             logger.error(f"Error generating tone: {e}")
             raise
     
+    @staticmethod
+    def wav_header(num_frames: int, sample_rate: int, sample_width: int = 2, channels: int = 1) -> bytes:
+        """Build a canonical 44-byte PCM WAV header"""
+        data_size = num_frames * sample_width * channels
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + data_size, b'WAVE',
+            b'fmt ', 16, 1, channels, sample_rate,
+            sample_rate * channels * sample_width, channels * sample_width, sample_width * 8,
+            b'data', data_size
+        )
+    
+    @staticmethod
+    def render_wav(frequency: int, duration: float, volume: float = 0.5,
+                   sample_rate: Optional[int] = None) -> Tuple[bytes, bytes]:
+        """Return a tone's WAV header and PCM payload, cached per parameter set"""
+        return _render_wav(frequency, duration, volume, sample_rate or AudioGenerator.sample_rate_for(frequency))
+    
+    @staticmethod
+    def render_base64(frequency: int, duration: float, volume: float = 0.5,
+                      sample_rate: Optional[int] = None) -> str:
+        """Return a tone as a base64 encoded WAV file, cached per parameter set"""
+        return _render_base64(frequency, duration, volume, sample_rate or AudioGenerator.sample_rate_for(frequency))
+    
+    @staticmethod
+    def preload_tones(sample_rate: Optional[int] = None) -> int:
+        """Render the hearing test tones into the cache, returns the number cached"""
+        for frequency in TEST_FREQUENCIES:
+            for duration, volume in PRELOAD_TONE_SETTINGS:
+                AudioGenerator.render_base64(frequency, duration, volume, sample_rate)
+        return _render_base64.cache_info().currsize
+    
+    @staticmethod
+    def tone_to_wav_bytes(tone: AudioSegment) -> bytes:
+        """Export an audio tone as WAV file bytes"""
+        # Header plus raw samples, no encoder round trip
+        header = AudioGenerator.wav_header(int(tone.frame_count()), tone.frame_rate, tone.sample_width, tone.channels)
+        return header + tone.raw_data
+    
     @staticmethod
     def tone_to_base64(tone: AudioSegment, format: str = "wav") -> str:
         """Convert audio tone to base64 string"""
         try:
-            # Export to bytes
-            buffer = io.BytesIO()
-            tone.export(buffer, format=format)
-            audio_bytes = buffer.getvalue()
+            if format == "wav":
+                audio_bytes = AudioGenerator.tone_to_wav_bytes(tone)
+            else:
+                # Other formats go through pydub's exporter
+                buffer = io.BytesIO()
+                tone.export(buffer, format=format)
+                audio_bytes = buffer.getvalue()
             
-            # Encode to base64
-            base64_audio = base64.b64encode(audio_bytes).decode('utf-8')
+            # Encode to base64 (the alphabet is pure ASCII)
+            base64_audio = base64.b64encode(audio_bytes).decode('ascii')
             return base64_audio
         except Exception as e:
             logger.error(f"Error converting tone to base64: {e}")
             raise
 
+# Entries are up to ~1 MB of PCM (10 s at 48 kHz) or ~1.3 MB of base64, so the
+# caches are kept small by entry count; the test tones need 14 base64 entries
+@functools.lru_cache(maxsize=64)
+def _render_wav(frequency: int, duration: float, volume: float, sample_rate: int) -> Tuple[bytes, bytes]:
+    """Synthesize a tone and return its WAV header and PCM payload"""
+    # Straight to bytes, no AudioSegment round trip
+    pcm = AudioGenerator.synthesize_pcm(frequency, duration, volume, sample_rate)
+    return AudioGenerator.wav_header(len(pcm), sample_rate), pcm.tobytes()
+
+@functools.lru_cache(maxsize=64)
+def _render_base64(frequency: int, duration: float, volume: float, sample_rate: int) -> str:
+    """Base64 encode a WAV tone"""
+    # Rendered uncached, so a base64 tone is not also held as raw WAV
+    header, pcm = _render_wav.__wrapped__(frequency, duration, volume, sample_rate)
+    return base64.b64encode(header + pcm).decode('ascii')
+
+# Health recommendations per hearing category, each ending with the screening disclaimer
+_DISCLAIMER = ("Note: This is a screening test, not a diagnostic evaluation.",)
+_REC_NORMAL = (
+    "Your hearing appears to be within normal limits.",
+    "Continue to protect your hearing from loud noises.",
+    "Consider annual hearing checks if you're over 50.",
+    "Use ear protection in noisy environments."
+)
+_REC_MILD = (
+    "You may have mild hearing loss.",
+    "Consider consulting an audiologist for a comprehensive evaluation.",
+    "You might benefit from hearing aids in certain situations.",
+    "Protect your hearing from further damage."
+)
+_REC_MODERATE = (
+    "You appear to have moderate hearing loss.",
+    "We strongly recommend seeing an audiologist.",
+    "Hearing aids would likely be beneficial.",
+    "Consider communication strategies and assistive devices."
+)
+_REC_SEVERE = (
+    "You appear to have significant hearing loss.",
+    "Please consult an audiologist or ENT specialist immediately.",
+    "You may benefit from hearing aids or cochlear implants.",
+    "Consider learning sign language or other communication methods."
+)
+RECOMMENDATIONS = {
+    "Normal": _REC_NORMAL + _DISCLAIMER,
+    "Mild": _REC_MILD + _DISCLAIMER,
+    "Moderate": _REC_MODERATE + _DISCLAIMER,
+    "Severe": _REC_SEVERE + _DISCLAIMER,
+    "Profound": _REC_SEVERE + _DISCLAIMER,
+}
+
 class HearingAnalyzer:
     """Analyzes hearing test results"""
     
+    @staticmethod
+    def pack_responses(responses: List[FrequencyResponse]) -> Tuple[np.ndarray, np.ndarray]:
+        """Pack responses into paired frequency / heard arrays for the array helpers"""
+        count = len(responses)
+        freqs = np.fromiter((response.frequency for response in responses), dtype=np.int64, count=count)
+        heard = np.fromiter((response.heard for response in responses), dtype=np.bool_, count=count)
+        return freqs, heard
+    
     @staticmethod
     def estimate_thresholds(responses: List[FrequencyResponse]) -> Dict[str, float]:
         """Estimate hearing thresholds from yes/no responses"""
-        thresholds = {}
-        
-        for response in responses:
-            freq_str = str(response.frequency)
-            
-            if response.heard:
-                # If heard, threshold is likely below 25 dB (normal)
-                thresholds[freq_str] = 20.0
-            else:
-                # If not heard, threshold is likely above 25 dB
-                # Use frequency-dependent estimation
-                if response.frequency <= 1000:
-                    thresholds[freq_str] = 35.0  # Mild loss
-                elif response.frequency <= 4000:
-                    thresholds[freq_str] = 40.0  # Mild to moderate
-                else:
-                    thresholds[freq_str] = 45.0  # High frequency loss common
-        
-        return thresholds
+        # Memoized on the response pattern (2^7 patterns cover the standard test), copied for the caller
+        return dict(_estimate_thresholds_frozen(tuple((response.frequency, response.heard) for response in responses)))
+    
+    @staticmethod
+    def threshold_values(freqs: np.ndarray, heard: np.ndarray) -> np.ndarray:
+        """Estimate hearing thresholds from paired frequency / heard arrays"""
+        return analysis_kernels.estimate_thresholds(
+            np.ascontiguousarray(freqs, dtype=np.int64), np.ascontiguousarray(heard, dtype=np.bool_)
+        )
+    
+    @staticmethod
+    def thresholds_by_frequency(freqs: np.ndarray, values: np.ndarray) -> Dict[str, float]:
+        """Key threshold values by frequency string, as used by the model and API"""
+        return dict(zip(map(str, freqs.tolist()), values.tolist()))
     
     @staticmethod
     def calculate_pta(thresholds: Dict[str, float]) -> float:
         """Calculate Pure-Tone Average (PTA) from thresholds"""
-        # Use standard PTA frequencies: 500, 1000, 2000, 4000 Hz
-        pta_frequencies = ['500', '1000', '2000', '4000']
-        pta_values = []
-        
-        for freq in pta_frequencies:
-            if freq in thresholds:
-                pta_values.append(thresholds[freq])
-        
-        if pta_values:
-            return sum(pta_values) / len(pta_values)
-        else:
-            # Fallback: use all available frequencies
-            if thresholds:
-                return sum(thresholds.values()) / len(thresholds)
-            else:
-                return 25.0  # Default normal threshold
+        # The mean does not depend on order, so any arrangement of the same thresholds shares an entry
+        return _calculate_pta_frozen(frozenset(thresholds.items()))
+    
+    @staticmethod
+    def calculate_pta_from_arrays(freqs: np.ndarray, values: np.ndarray) -> float:
+        """Calculate Pure-Tone Average (PTA) from paired frequency / threshold arrays"""
+        # A repeated frequency counts once with its last value, as in thresholds_by_frequency
+        _, last = np.unique(freqs[::-1], return_index=True)
+        if len(last) < len(freqs):
+            keep = len(freqs) - 1 - last
+            freqs, values = freqs[keep], values[keep]
+        # Standard PTA frequencies 500, 1000, 2000, 4000 Hz, falling back to all frequencies
+        return analysis_kernels.pure_tone_average(
+            np.ascontiguousarray(freqs, dtype=np.int64), np.ascontiguousarray(values, dtype=np.float64)
+        )
     
     @staticmethod
     def get_recommendations(category: str, pta: float) -> List[str]:
         """Get health recommendations based on hearing category"""
-        recommendations = []
-        
-        if category == "Normal":
-            recommendations = [
-                "Your hearing appears to be within normal limits.",
-                "Continue to protect your hearing from loud noises.",
-                "Consider annual hearing checks if you're over 50.",
-                "Use ear protection in noisy environments."
-            ]
-        elif category == "Mild":
-            recommendations = [
-                "You may have mild hearing loss.",
-                "Consider consulting an audiologist for a comprehensive evaluation.",
-                "You might benefit from hearing aids in certain situations.",
-                "Protect your hearing from further damage."
-            ]
-        elif category == "Moderate":
-            recommendations = [
-                "You appear to have moderate hearing loss.",
-                "We strongly recommend seeing an audiologist.",
-                "Hearing aids would likely be beneficial.",
-                "Consider communication strategies and assistive devices."
-            ]
-        elif category in ["Severe", "Profound"]:
-            recommendations = [
-                "You appear to have significant hearing loss.",
-                "Please consult an audiologist or ENT specialist immediately.",
-                "You may benefit from hearing aids or cochlear implants.",
-                "Consider learning sign language or other communication methods."
-            ]
-        
-        recommendations.append("Note: This is a screening test, not a diagnostic evaluation.")
-        return recommendations
+        # Fresh list per call, callers may extend it
+        return list(RECOMMENDATIONS.get(category, _DISCLAIMER))
     
     @staticmethod
     def assess_risk_level(category: str, age: Optional[int] = None, pta: Optional[float] = None,
@@ -231,26 +531,64 @@ class HearingAnalyzer:
         # Calculate frequencies heard
         frequencies_heard = total_frequencies - (frequencies_not_heard or 0)
 
-        # Simple rule-based risk assessment based on user requirements:
-        # - No voices heard = High risk (Red)
-        # - All voices heard = Low risk (Green)
-        # - More than 2 voices heard = Medium risk (Yellow)
-        # - 2 or fewer voices heard = High risk (Red)
+        # Precomputed for the usual test sizes, rule chain otherwise
+        table = RISK_TABLE.get(total_frequencies)
+        if table is not None and 0 <= frequencies_heard <= total_frequencies:
+            return table[frequencies_heard]
+        return _risk_for_counts(frequencies_heard, total_frequencies)
 
-        if frequencies_heard == 0:
-            return "Critical"  # No voices heard - High risk (Red)
-        elif frequencies_heard == 1:
-            return "High"  # More than 2 voices heard - Medium risk (Yellow)
-        elif frequencies_heard == total_frequencies:
-            return "Low"   # All voices heard - Low risk (Green)
-        elif frequencies_heard > 2:
-            return "Medium"  # More than 2 voices heard - Medium risk (Yellow)
-        else:
-            return "High"    # 2 or fewer voices heard - High risk (Red)
+def _risk_for_counts(frequencies_heard: int, total_frequencies: int) -> str:
+    """Rule-based risk level for the number of frequencies heard out of those tested"""
+    # Simple rule-based risk assessment based on user requirements:
+    # - No voices heard = High risk (Red)
+    # - All voices heard = Low risk (Green)
+    # - More than 2 voices heard = Medium risk (Yellow)
+    # - 2 or fewer voices heard = High risk (Red)
+
+    if frequencies_heard == 0:
+        return "Critical"  # No voices heard - High risk (Red)
+    elif frequencies_heard == 1:
+        return "High"  # More than 2 voices heard - Medium risk (Yellow)
+    elif frequencies_heard == total_frequencies:
+        return "Low"   # All voices heard - Low risk (Green)
+    elif frequencies_heard > 2:
+        return "Medium"  # More than 2 voices heard - Medium risk (Yellow)
+    else:
+        return "High"    # 2 or fewer voices heard - High risk (Red)
 
-# Global model manager instance
-model_manager = ModelManager()
+# Risk level by frequencies heard, per number of frequencies tested (up to the full test)
+RISK_TABLE = {
+    total: tuple(_risk_for_counts(heard, total) for heard in range(total + 1))
+    for total in range(1, len(TEST_FREQUENCIES) + 1)
+}
+
+@functools.lru_cache(maxsize=512)
+def _estimate_thresholds_frozen(pattern: Tuple[Tuple[int, bool], ...]) -> Tuple[Tuple[str, float], ...]:
+    """Thresholds for a frozen (frequency, heard) response pattern"""
+    freqs = np.fromiter((frequency for frequency, _ in pattern), dtype=np.int64, count=len(pattern))
+    heard = np.fromiter((was_heard for _, was_heard in pattern), dtype=np.bool_, count=len(pattern))
+    return tuple(HearingAnalyzer.thresholds_by_frequency(freqs, HearingAnalyzer.threshold_values(freqs, heard)).items())
+
+@functools.lru_cache(maxsize=512)
+def _calculate_pta_frozen(items: frozenset) -> float:
+    """PTA for a frozen set of (frequency, threshold) items"""
+    freqs = np.fromiter((int(frequency) for frequency, _ in items), dtype=np.int64, count=len(items))
+    values = np.fromiter((value for _, value in items), dtype=np.float64, count=len(items))
+    return HearingAnalyzer.calculate_pta_from_arrays(freqs, values)
+
+# Global model manager instance, loaded on first use
+_model_manager: Optional[ModelManager] = None
+_model_manager_lock = threading.Lock()
 
 def get_model_manager() -> ModelManager:
     """Get the global model manager instance"""
-    return model_manager
+    global _model_manager
+    if _model_manager is None:
+        with _model_manager_lock:
+            if _model_manager is None:
+                _model_manager = ModelManager()
+    return _model_manager
+
+# Prebuild the hearing test tones so hot requests are cache lookups
+# (this also makes the first call into the compiled sine kernel)
+AudioGenerator.preload_tones()
@@ -3,22 +3,111 @@ SoundCheck - ML-Powered Hearing Test Streamlit Application
 Professional, clean, and attractive frontend for the hearing test system
 """
 
+import base64
+import csv
+import html
+import io
 import streamlit as st
-import time
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import pandas as pd
 
 # Import our custom modules
 from utils import (
-    APIClient, AudioPlayer, DataVisualizer, SessionManager,
-    format_recommendations, get_category_color, format_confidence
+    AudioPlayer, DataVisualizer, SessionManager, get_api_client,
+    get_category_color, format_confidence, synthesize_tone
 )
 from config import (
-    APP_CONFIG, TEST_CONFIG, load_css, create_header, create_info_card,
-    create_metric_card, create_progress_bar, create_frequency_display,
-    create_result_category_display, ICONS
+    APP_CONFIG, TEST_CONFIG, load_css, create_header,
+    create_progress_bar, create_frequency_display, HTMLBatch
 )
-from hearing_loss_simulator import show_hearing_loss_simulator
+
+# Test frequencies, fixed for the lifetime of the app
+_FREQUENCIES = tuple(TEST_CONFIG["frequencies"])
+
+# Risk card colors
+_RISK_COLORS = {"Low": "#28a745", "Medium": "#ffc107", "High": "#dc3545"}
+
+# Static page HTML, built once at import; templates only fill in the dynamic fields.
+# Rendered with st.html, which skips the markdown parser
+_INSTRUCTIONS_HTML = """
+<div style="background: linear-gradient(135deg, #667eea, #764ba2); color: white; padding: 1.5rem; border-radius: 15px; margin: 1rem 0; box-shadow: 0 4px 12px rgba(0,0,0,0.2);">
+    <h4 style="color: white; margin-top: 0; margin-bottom: 1rem;">🎧 Before Starting:</h4>
+    <div style="margin-bottom: 0.8rem;">
+        <strong>1. Use headphones or earbuds</strong><br>
+        <small style="opacity: 0.9;">For accurate results</small>
+    </div>
+    <div style="margin-bottom: 0.8rem;">
+        <strong>2. Find a quiet environment</strong><br>
+        <small style="opacity: 0.9;">Minimize background noise</small>
+    </div>
+    <div style="margin-bottom: 0.8rem;">
+        <strong>3. Adjust your volume</strong><br>
+        <small style="opacity: 0.9;">To a comfortable level</small>
+    </div>
+    <div style="margin-bottom: 0;">
+        <strong>4. Focus and be honest</strong><br>
+        <small style="opacity: 0.9;">With your responses</small>
+    </div>
+</div>
+"""
+
+_LISTEN_BANNER_TMPL = """
+<div style="background: linear-gradient(135deg, #28a745, #20c997); color: white; padding: 2rem; border-radius: 15px; margin: 1.5rem 0; text-align: center; box-shadow: 0 4px 12px rgba(0,0,0,0.2);">
+    <h2 style="color: white; margin-top: 0; margin-bottom: 1rem;">🔊 Listen Carefully</h2>
+    <p style="font-size: 1.2rem; margin-bottom: 1rem; opacity: 0.95;">
+        Click the <strong>Play</strong> button below to hear a tone at <strong>{frequency} Hz</strong>
+    </p>
+    <p style="font-size: 1rem; margin-bottom: 0; opacity: 0.9;">
+        Then honestly indicate whether you heard it or not
+    </p>
+</div>
+"""
+
+_RESULTS_HEADER_HTML = """
+<div style="text-align: center; margin-bottom: 2rem;">
+    <h1 style="color: white; font-size: 2.2rem; margin-bottom: 0.5rem;">🎯 Your Hearing Analysis</h1>
+    <p style="color: rgba(255,255,255,0.8); font-size: 1.1rem; margin: 0;">ML-powered assessment complete</p>
+</div>
+"""
+
+_CATEGORY_CARD_TMPL = """
+<div style="background: linear-gradient(135deg, {color}, {color}dd);
+            color: white; padding: 1.5rem; border-radius: 12px; text-align: center;
+            margin-bottom: 1.5rem; box-shadow: 0 4px 12px rgba(0,0,0,0.15);">
+    <div style="font-size: 2rem; font-weight: bold; margin-bottom: 0.3rem;">
+        {category} Hearing
+    </div>
+    <div style="font-size: 0.95rem; opacity: 0.9;">
+        Classification Result
+    </div>
+</div>
+"""
+
+_METRIC_CARD_TMPL = """
+<div style="background: rgba(255,255,255,0.1); padding: 1.2rem; border-radius: 10px; text-align: center;
+            border: 1px solid rgba(255,255,255,0.2); backdrop-filter: blur(10px);">
+    <div style="font-size: 1.8rem; font-weight: bold; color: {color}; margin-bottom: 0.3rem;">
+        {value}
+    </div>
+    <div style="font-size: 0.85rem; color: rgba(255,255,255,0.9); text-transform: uppercase; letter-spacing: 1px;">
+        {label}
+    </div>
+</div>
+"""
+
+_SUMMARY_CARD_TMPL = """
+<div style="background: rgba(255,255,255,0.1); padding: 1rem; border-radius: 10px; text-align: center;
+            border: 1px solid rgba(255,255,255,0.2);">
+    <div style="font-size: 1.5rem; font-weight: bold; color: {color}; margin-bottom: 0.3rem;">
+        {value}
+    </div>
+    <div style="font-size: 0.8rem; color: rgba(255,255,255,0.8);">
+        {label}
+    </div>
+</div>
+"""
 
 # Configure the Streamlit page
 st.set_page_config(**APP_CONFIG)
@@ -30,16 +119,116 @@ load_css()
 SessionManager.initialize_session()
 
 # Initialize API client
-@st.cache_resource
-def get_api_client():
-    return APIClient()
-
 api_client = get_api_client()
 
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_health():
+    """Backend health, probed at most once every 10 seconds"""
+    return api_client.health_check()
+
 def check_backend_connection():
     """Check if backend is available"""
-    health = api_client.health_check()
-    return health.get("status") == "healthy"
+    if _cached_health().get("status") == "healthy":
+        return True
+    # Don't hold on to a failure, retry on the next rerun
+    _cached_health.clear()
+    return False
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _fetch_tone(frequency: int, duration: float, volume: float):
+    """Generate a tone once per setting; failures raise so they are not cached"""
+    audio_response = api_client.generate_audio(frequency=frequency, duration=duration, volume=volume)
+    if not audio_response.get("success"):
+        raise RuntimeError(audio_response.get("error", "Unknown error"))
+    # Decode once here so replays hand st.audio the same cached bytes
+    audio_response["audio_bytes"] = base64.b64decode(audio_response.pop("audio_data"))
+    return audio_response
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False)
+def _fetch_tone_batch(frequencies: tuple, duration: float, volume: float):
+    """Generate the tones for every test frequency in one request, or as concurrent
+    single requests on a backend without the batch route. A failure is cached as
+    None for a few minutes, so each tone falls back to its own request instead of
+    retrying the whole set first"""
+    batch_response = api_client.generate_audio_batch(list(frequencies), duration=duration, volume=volume)
+    if batch_response.get("success"):
+        responses = batch_response["tones"]
+    else:
+        responses = api_client.generate_audio_many(list(frequencies), duration=duration, volume=volume)
+        if not all(audio_response.get("success") for audio_response in responses):
+            return None
+    tones = {}
+    for frequency, audio_response in zip(frequencies, responses):
+        audio_response["audio_bytes"] = base64.b64decode(audio_response.pop("audio_data"))
+        tones[frequency] = audio_response
+    return tones
+
+def get_tone(frequency: int):
+    """Get the hearing test tone for a frequency, served from cache after the first request"""
+    duration, volume = TEST_CONFIG["tone_duration"], TEST_CONFIG["tone_volume"]
+    if TEST_CONFIG["local_tones"]:
+        return {"success": True, "audio_bytes": synthesize_tone(frequency, duration, volume)}
+    if frequency in _FREQUENCIES:
+        tones = _fetch_tone_batch(_FREQUENCIES, duration, volume)
+        if tones is not None:
+            return tones[frequency]
+    try:
+        return _fetch_tone(frequency, duration, volume)
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _fetch_analysis(user_info: tuple, frequency_responses: tuple):
+    """Analyze a test once per distinct input; failures raise so they are not cached"""
+    analysis_result = api_client.analyze_hearing_test(
+        user_info=dict(user_info),
+        frequency_responses=[{"frequency": freq, "heard": heard} for freq, heard in frequency_responses]
+    )
+    if not analysis_result.get("success"):
+        raise RuntimeError(analysis_result.get("error", "Unknown error"))
+    return analysis_result
+
+def analyze_test(user_info, frequency_responses):
+    """Analyze hearing test results (a frequency -> heard mapping), served from cache on reruns"""
+    try:
+        return _fetch_analysis(
+            tuple(user_info.items()),
+            tuple(frequency_responses.items())
+        )
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}
+
+@st.cache_resource
+def get_prefetch_pool():
+    return ThreadPoolExecutor(max_workers=min(8, len(_FREQUENCIES)))
+
+def submit_prefetch(fn, *args):
+    """Run fn on the prefetch pool under this script run's context, so the
+    st.cache_data calls it makes don't warn about a missing ScriptRunContext"""
+    ctx = get_script_run_ctx()
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    return get_prefetch_pool().submit(run)
+
+def prefetch_tones():
+    """Warm the tone cache for every test frequency in the background"""
+    if TEST_CONFIG["local_tones"]:
+        # Synthesized on demand in a few milliseconds, nothing to warm
+        return
+    st.session_state.prefetch_futures = [submit_prefetch(
+        _fetch_tone_batch, _FREQUENCIES, TEST_CONFIG["tone_duration"], TEST_CONFIG["tone_volume"]
+    )]
+
+def warm_analysis():
+    """After the last answer, start the analysis in the background so the results page is a cache hit"""
+    if st.session_state.current_frequency_index < len(_FREQUENCIES):
+        return
+    submit_prefetch(
+        analyze_test,
+        dict(st.session_state.user_info),
+        dict(st.session_state.frequency_responses)
+    )
 
 def show_welcome_page():
     """Display the welcome page"""
@@ -86,6 +275,7 @@ def show_welcome_page():
         # Start test button
         if st.button("🎧 Start Hearing Test", type="primary", use_container_width=True):
             st.session_state.test_started = True
+            prefetch_tones()
             st.session_state.current_page = "Hearing Test"
             st.rerun()
 
@@ -109,33 +299,108 @@ def show_welcome_page():
         # Quick Instructions - improved visibility
         st.markdown("### 📋 Quick Instructions")
 
-        st.markdown("""
-        <div style="background: linear-gradient(135deg, #667eea, #764ba2); color: white; padding: 1.5rem; border-radius: 15px; margin: 1rem 0; box-shadow: 0 4px 12px rgba(0,0,0,0.2);">
-            <h4 style="color: white; margin-top: 0; margin-bottom: 1rem;">🎧 Before Starting:</h4>
-            <div style="margin-bottom: 0.8rem;">
-                <strong>1. Use headphones or earbuds</strong><br>
-                <small style="opacity: 0.9;">For accurate results</small>
-            </div>
-            <div style="margin-bottom: 0.8rem;">
-                <strong>2. Find a quiet environment</strong><br>
-                <small style="opacity: 0.9;">Minimize background noise</small>
-            </div>
-            <div style="margin-bottom: 0.8rem;">
-                <strong>3. Adjust your volume</strong><br>
-                <small style="opacity: 0.9;">To a comfortable level</small>
-            </div>
-            <div style="margin-bottom: 0;">
-                <strong>4. Focus and be honest</strong><br>
-                <small style="opacity: 0.9;">With your responses</small>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(_INSTRUCTIONS_HTML)
+
+@st.fragment
+def show_question_card(current_frequency: int):
+    """Play button and answer buttons; a Play click reruns only this card"""
+    # Frequency display
+    create_frequency_display(current_frequency)
+    
+    # Audio player
+    st.markdown("### 🔊 Audio Test")
+    
+    # Initialize audio played tracking
+    if 'audio_played_for_frequency' not in st.session_state:
+        st.session_state.audio_played_for_frequency = {}
+
+    # Check if audio has been played for current frequency
+    audio_played = st.session_state.audio_played_for_frequency.get(current_frequency, False)
+
+    # Play button
+    if st.button(f"▶️ Play {current_frequency} Hz Tone",
+                type="primary", use_container_width=True):
+        with st.spinner("Generating audio..."):
+            audio_response = get_tone(current_frequency)
+
+            if audio_response.get("success"):
+                # Mark audio as played for this frequency
+                st.session_state.audio_played_for_frequency[current_frequency] = True
+
+                # Show audio player
+                AudioPlayer.play_audio_bytes(
+                    audio_response["audio_bytes"],
+                    autoplay=True
+                )
+                st.success("🔊 Audio is playing for 3 seconds! You can now make your selection below.")
+            else:
+                st.error(f"Failed to generate audio: {audio_response.get('error')}")
+    
+    st.markdown("---")
+
+    # Response buttons
+    st.markdown("### Did you hear the tone?")
+
+    # Check if audio has been played for current frequency
+    audio_played = st.session_state.audio_played_for_frequency.get(current_frequency, False)
+
+    if not audio_played:
+        st.info("🎵 Please play the audio first before making your selection.")
+
+    col_yes, col_no = st.columns(2)
+
+    with col_yes:
+        if st.button("✅ Yes, I heard it", use_container_width=True, type="primary",
+                    disabled=not audio_played):
+            SessionManager.save_response(current_frequency, True)
+            st.session_state.current_frequency_index += 1
+            # Clear the audio played status for next frequency
+            st.session_state.audio_played_for_frequency[current_frequency] = False
+            warm_analysis()
+
+            # Transition message shows on the next run without holding this one
+            st.toast("Response recorded! Moving to next frequency...", icon="✅")
+            # Whole-app rerun: the progress bar and sidebar follow the index
+            st.rerun(scope="app")
+
+    with col_no:
+        if st.button("❌ No, I didn't hear it", use_container_width=True,
+                    disabled=not audio_played):
+            SessionManager.save_response(current_frequency, False)
+            st.session_state.current_frequency_index += 1
+            # Clear the audio played status for next frequency
+            st.session_state.audio_played_for_frequency[current_frequency] = False
+            warm_analysis()
+
+            # Transition message shows on the next run without holding this one
+            st.toast("Response recorded! Moving to next frequency...", icon="✅")
+            # Whole-app rerun: the progress bar and sidebar follow the index
+            st.rerun(scope="app")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _progress_markdown(current_index: int, responses: tuple) -> str:
+    """Sidebar progress list, built once per test position"""
+    heard_by_frequency = dict(responses)
+    lines = []
+    for i, freq in enumerate(_FREQUENCIES):
+        if i < current_index:
+            heard = heard_by_frequency.get(freq)
+            if heard is not None:
+                status = "✅ Heard" if heard else "❌ Not heard"
+                lines.append(f"**{freq} Hz**: {status}")
+        elif i == current_index:
+            lines.append(f"**{freq} Hz**: 🔄 Current")
+        else:
+            lines.append(f"**{freq} Hz**: ⏳ Pending")
+    return "\n\n".join(lines)
 
 def show_hearing_test():
     """Display the hearing test interface"""
-    create_header()
+    # Header, progress bar and instructions go out as one element
+    batch = HTMLBatch()
+    create_header(batch)
     
-    frequencies = TEST_CONFIG["frequencies"]
+    frequencies = _FREQUENCIES
     current_index = st.session_state.current_frequency_index
     
     if current_index >= len(frequencies):
@@ -147,126 +412,43 @@ def show_hearing_test():
     current_frequency = frequencies[current_index]
     
     # Progress bar
-    create_progress_bar(current_index + 1, len(frequencies))
+    create_progress_bar(current_index + 1, len(frequencies), batch=batch)
     
     # Test instructions - improved
-    st.markdown("""
-    <div style="background: linear-gradient(135deg, #28a745, #20c997); color: white; padding: 2rem; border-radius: 15px; margin: 1.5rem 0; text-align: center; box-shadow: 0 4px 12px rgba(0,0,0,0.2);">
-        <h2 style="color: white; margin-top: 0; margin-bottom: 1rem;">🔊 Listen Carefully</h2>
-        <p style="font-size: 1.2rem; margin-bottom: 1rem; opacity: 0.95;">
-            Click the <strong>Play</strong> button below to hear a tone at <strong>{} Hz</strong>
-        </p>
-        <p style="font-size: 1rem; margin-bottom: 0; opacity: 0.9;">
-            Then honestly indicate whether you heard it or not
-        </p>
-    </div>
-    """.format(current_frequency), unsafe_allow_html=True)
+    batch.add(_LISTEN_BANNER_TMPL.format(frequency=current_frequency))
+    batch.flush()
     
     # Main test interface
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
-        # Frequency display
-        create_frequency_display(current_frequency)
-        
-        # Audio player
-        st.markdown("### 🔊 Audio Test")
-        
-        # Initialize audio played tracking
-        if 'audio_played_for_frequency' not in st.session_state:
-            st.session_state.audio_played_for_frequency = {}
-
-        # Check if audio has been played for current frequency
-        audio_played = st.session_state.audio_played_for_frequency.get(current_frequency, False)
-
-        # Play button
-        if st.button(f"▶️ Play {current_frequency} Hz Tone",
-                    type="primary", use_container_width=True):
-            with st.spinner("Generating audio..."):
-                audio_response = api_client.generate_audio(
-                    frequency=current_frequency,
-                    duration=TEST_CONFIG["tone_duration"],
-                    volume=TEST_CONFIG["tone_volume"]
-                )
-
-                if audio_response.get("success"):
-                    # Mark audio as played for this frequency
-                    st.session_state.audio_played_for_frequency[current_frequency] = True
-
-                    # Show audio player
-                    AudioPlayer.play_audio_from_base64(
-                        audio_response["audio_data"],
-                        autoplay=True
-                    )
-                    st.success("🔊 Audio is playing for 3 seconds! You can now make your selection below.")
-                else:
-                    st.error(f"Failed to generate audio: {audio_response.get('error')}")
-        
-        st.markdown("---")
-
-        # Response buttons
-        st.markdown("### Did you hear the tone?")
-
-        # Check if audio has been played for current frequency
-        audio_played = st.session_state.audio_played_for_frequency.get(current_frequency, False)
-
-        if not audio_played:
-            st.info("🎵 Please play the audio first before making your selection.")
-
-        # Create a placeholder for the response section
-        response_placeholder = st.empty()
-
-        with response_placeholder.container():
-            col_yes, col_no = st.columns(2)
-
-            with col_yes:
-                if st.button("✅ Yes, I heard it", use_container_width=True, type="primary",
-                            disabled=not audio_played):
-                    SessionManager.save_response(current_frequency, True)
-                    st.session_state.current_frequency_index += 1
-                    # Clear the audio played status for next frequency
-                    st.session_state.audio_played_for_frequency[current_frequency] = False
-
-                    # Clear the response section and show transition message
-                    response_placeholder.success("✅ Response recorded! Moving to next frequency...")
-                    time.sleep(1.0)
-                    st.rerun()
-
-            with col_no:
-                if st.button("❌ No, I didn't hear it", use_container_width=True,
-                            disabled=not audio_played):
-                    SessionManager.save_response(current_frequency, False)
-                    st.session_state.current_frequency_index += 1
-                    # Clear the audio played status for next frequency
-                    st.session_state.audio_played_for_frequency[current_frequency] = False
-
-                    # Clear the response section and show transition message
-                    response_placeholder.success("✅ Response recorded! Moving to next frequency...")
-                    time.sleep(1.0)
-                    st.rerun()
+        show_question_card(current_frequency)
     
     # Sidebar with progress
     with st.sidebar:
         st.markdown("### Test Progress")
         
-        # Show completed frequencies
-        for i, freq in enumerate(frequencies):
-            if i < current_index:
-                response = next((r for r in st.session_state.frequency_responses 
-                               if r["frequency"] == freq), None)
-                if response:
-                    status = "✅ Heard" if response["heard"] else "❌ Not heard"
-                    st.markdown(f"**{freq} Hz**: {status}")
-            elif i == current_index:
-                st.markdown(f"**{freq} Hz**: 🔄 Current")
-            else:
-                st.markdown(f"**{freq} Hz**: ⏳ Pending")
+        # Show completed frequencies, all rows in one markdown element
+        st.markdown(_progress_markdown(
+            current_index,
+            tuple(st.session_state.frequency_responses.items())
+        ))
         
         # Reset button
         if st.button("🔄 Restart Test"):
             SessionManager.reset_test()
             st.session_state.current_page = "Hearing Test"
             st.rerun()
+    
+    # Prefetch the next tone in the background, once per frequency, so its Play click is a cache hit
+    prefetched = st.session_state.setdefault("prefetched_tones", set())
+    if current_index + 1 < len(frequencies) and frequencies[current_index + 1] not in prefetched:
+        prefetched.add(frequencies[current_index + 1])
+        submit_prefetch(get_tone, frequencies[current_index + 1])
+
+def _metric_card(col, value, label: str, color: str, template: str = _METRIC_CARD_TMPL):
+    """Render one compact metric card into a column"""
+    col.html(template.format_map({"color": color, "value": value, "label": label}))
 
 def show_results():
     """Display the test results"""
@@ -276,11 +458,11 @@ def show_results():
         st.error("No test data available. Please take the test first.")
         return
     
-    # Analyze results
+    # Analyze results (once per distinct test, reruns reuse the cached analysis)
     with st.spinner("🧠 Analyzing your hearing profile with AI..."):
-        analysis_result = api_client.analyze_hearing_test(
-            user_info=st.session_state.user_info,
-            frequency_responses=st.session_state.frequency_responses
+        analysis_result = analyze_test(
+            st.session_state.user_info,
+            st.session_state.frequency_responses
         )
     
     if not analysis_result.get("success"):
@@ -291,115 +473,34 @@ def show_results():
     st.session_state.test_results = result
     
     # Clean, professional results header
-    st.markdown("""
-    <div style="text-align: center; margin-bottom: 2rem;">
-        <h1 style="color: white; font-size: 2.2rem; margin-bottom: 0.5rem;">🎯 Your Hearing Analysis</h1>
-        <p style="color: rgba(255,255,255,0.8); font-size: 1.1rem; margin: 0;">ML-powered assessment complete</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(_RESULTS_HEADER_HTML)
 
     # Category result - more compact and professional
     category = result["predicted_category"]
-    category_colors = {
-        "Normal": "#28a745",
-        "Mild": "#ffc107",
-        "Moderate": "#fd7e14",
-        "Severe": "#dc3545",
-        "Profound": "#6f42c1"
-    }
-    category_color = category_colors.get(category, "#6c757d")
+    category_color = get_category_color(category)
 
     # Main result card - more compact
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, {category_color}, {category_color}dd);
-                color: white; padding: 1.5rem; border-radius: 12px; text-align: center;
-                margin-bottom: 1.5rem; box-shadow: 0 4px 12px rgba(0,0,0,0.15);">
-        <div style="font-size: 2rem; font-weight: bold; margin-bottom: 0.3rem;">
-            {category} Hearing
-        </div>
-        <div style="font-size: 0.95rem; opacity: 0.9;">
-            Classification Result
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(_CATEGORY_CARD_TMPL.format(category=category, color=category_color))
 
     # Key metrics in a single row - dark theme
     col_pta, col_conf, col_risk = st.columns(3)
+    risk_color = _RISK_COLORS.get(result['risk_level'], "#6c757d")
 
-    with col_pta:
-        st.markdown(f"""
-        <div style="background: rgba(255,255,255,0.1); padding: 1.2rem; border-radius: 10px; text-align: center;
-                    border: 1px solid rgba(255,255,255,0.2); backdrop-filter: blur(10px);">
-            <div style="font-size: 1.8rem; font-weight: bold; color: #667eea; margin-bottom: 0.3rem;">
-                {result['pta_score']:.1f} dB
-            </div>
-            <div style="font-size: 0.85rem; color: rgba(255,255,255,0.9); text-transform: uppercase; letter-spacing: 1px;">
-                PTA Score
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col_conf:
-        st.markdown(f"""
-        <div style="background: rgba(255,255,255,0.1); padding: 1.2rem; border-radius: 10px; text-align: center;
-                    border: 1px solid rgba(255,255,255,0.2); backdrop-filter: blur(10px);">
-            <div style="font-size: 1.8rem; font-weight: bold; color: #28a745; margin-bottom: 0.3rem;">
-                {format_confidence(result['confidence_score'])}
-            </div>
-            <div style="font-size: 0.85rem; color: rgba(255,255,255,0.9); text-transform: uppercase; letter-spacing: 1px;">
-                Confidence
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col_risk:
-        risk_colors = {"Low": "#28a745", "Medium": "#ffc107", "High": "#dc3545"}
-        risk_color = risk_colors.get(result['risk_level'], "#6c757d")
-
-        st.markdown(f"""
-        <div style="background: rgba(255,255,255,0.1); padding: 1.2rem; border-radius: 10px; text-align: center;
-                    border: 1px solid rgba(255,255,255,0.2); backdrop-filter: blur(10px);">
-            <div style="font-size: 1.8rem; font-weight: bold; color: {risk_color}; margin-bottom: 0.3rem;">
-                {result['risk_level']}
-            </div>
-            <div style="font-size: 0.85rem; color: rgba(255,255,255,0.9); text-transform: uppercase; letter-spacing: 1px;">
-                Risk Level
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    _metric_card(col_pta, f"{result['pta_score']:.1f} dB", "PTA Score", "#667eea")
+    _metric_card(col_conf, format_confidence(result['confidence_score']), "Confidence", "#28a745")
+    _metric_card(col_risk, result['risk_level'], "Risk Level", risk_color)
 
     # Test Summary - compact and professional
     st.markdown("### 📈 Test Summary")
     total_freq = len(st.session_state.frequency_responses)
-    heard_freq = sum(1 for r in st.session_state.frequency_responses if r["heard"])
+    heard_freq = st.session_state.heard_count
 
     col_summary1, col_summary2 = st.columns(2)
 
-    with col_summary1:
-        st.markdown(f"""
-        <div style="background: rgba(255,255,255,0.1); padding: 1rem; border-radius: 10px; text-align: center;
-                    border: 1px solid rgba(255,255,255,0.2);">
-            <div style="font-size: 1.5rem; font-weight: bold; color: #667eea; margin-bottom: 0.3rem;">
-                {heard_freq}/{total_freq}
-            </div>
-            <div style="font-size: 0.8rem; color: rgba(255,255,255,0.8);">
-                Frequencies Heard
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col_summary2:
-        st.markdown(f"""
-        <div style="background: rgba(255,255,255,0.1); padding: 1rem; border-radius: 10px; text-align: center;
-                    border: 1px solid rgba(255,255,255,0.2);">
-            <div style="font-size: 1.5rem; font-weight: bold; color: #28a745; margin-bottom: 0.3rem;">
-                {(heard_freq/total_freq)*100:.0f}%
-            </div>
-            <div style="font-size: 0.8rem; color: rgba(255,255,255,0.8);">
-                Success Rate
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    _metric_card(col_summary1, f"{heard_freq}/{total_freq}", "Frequencies Heard", "#667eea",
+                 template=_SUMMARY_CARD_TMPL)
+    _metric_card(col_summary2, f"{(heard_freq/total_freq)*100:.0f}%", "Success Rate", "#28a745",
+                 template=_SUMMARY_CARD_TMPL)
 
     # Visualizations section
     st.markdown("### 📊 Detailed Analysis")
@@ -422,16 +523,15 @@ def show_results():
 
     recommendations = result.get("recommendations", [])
     if recommendations:
-        # Clean recommendations without white box
-        for i, rec in enumerate(recommendations, 1):
-            st.markdown(f"""
+        # Clean recommendations without white box, emitted as one HTML block
+        st.html("".join(f"""
             <div style="background: rgba(40, 167, 69, 0.1); padding: 0.8rem; border-radius: 8px;
                         border-left: 4px solid #28a745; margin: 0.5rem 0;">
                 <span style="color: rgba(255,255,255,0.9); font-size: 0.95rem;">
-                    <strong>{i}.</strong> {rec}
+                    <strong>{i}.</strong> {html.escape(rec)}
                 </span>
             </div>
-            """, unsafe_allow_html=True)
+            """ for i, rec in enumerate(recommendations, 1)))
     else:
         st.info("No specific recommendations available.")
     
@@ -456,15 +556,21 @@ def show_results():
             "Frequencies Heard": heard_freq
         }
         
-        report_df = pd.DataFrame([report_data])
-        csv = report_df.to_csv(index=False)
+        # One header row and one value row, no DataFrame needed
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(report_data.keys())
+        writer.writerow(report_data.values())
+        report_csv = buffer.getvalue()
         
         st.download_button(
             label="📄 Download Report",
-            data=csv,
+            data=report_csv,
             file_name=f"hearing_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv",
-            use_container_width=True
+            use_container_width=True,
+            # Downloading needs no server work, don't rerun the results page
+            on_click="ignore"
         )
 
 def main():
@@ -534,6 +640,8 @@ def main():
     
     # Main content routing
     if st.session_state.current_page == "Hearing Loss Simulator":
+        # Imported on first visit so the test pages never load the DSP stack
+        from hearing_loss_simulator import show_hearing_loss_simulator
         show_hearing_loss_simulator()
     elif st.session_state.current_page == "Hearing Test":
         if st.session_state.test_completed:
@@ -545,6 +653,7 @@ def main():
         else:
             # Start test if navigated to Hearing Test page
             st.session_state.test_started = True
+            prefetch_tones()
             show_hearing_test()
     else:
         # Home page
@@ -2,7 +2,12 @@
 Configuration and styling for the SoundCheck Streamlit Frontend
 """
 
+import re
 import streamlit as st
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
 
 # App Configuration
 APP_CONFIG = {
@@ -14,9 +19,11 @@ APP_CONFIG = {
 
 # Test Configuration
 TEST_CONFIG = {
-    "frequencies": [500, 1000, 2000, 3000, 4000, 6000, 8000],
+    "frequencies": (500, 1000, 2000, 3000, 4000, 6000, 8000),
     "tone_duration": 3.0,
     "tone_volume": 0.6,
+    # Synthesize test tones in the app; False requests them from the backend
+    "local_tones": True,
     "instructions": {
         "setup": """
         ### 🎧 Test Setup Instructions
@@ -49,329 +56,107 @@ TEST_CONFIG = {
 }
 
 # Styling and CSS
+# Stylesheet lives in static/soundcheck.css and is read once at import
+_CSS_PATH = Path(__file__).parent / "static" / "soundcheck.css"
+_CSS_BLOB = _CSS_PATH.read_text(encoding="utf-8")
+
+def _minify_css(css: str) -> str:
+    """Drop comments and collapse whitespace"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};])\s*", r"\1", css).strip()
+
+_CSS_MIN = _minify_css(_CSS_BLOB)
+
+@st.cache_data(show_spinner=False)
+def _css_payload() -> str:
+    """Build the style tag once per process"""
+    return f"<style>{_CSS_MIN}</style>"
+
 def load_css():
     """Load custom CSS styling"""
-    st.markdown("""
-    <style>
-    /* Main app styling */
-    .main {
-        padding-top: 2rem;
-    }
-    
-    /* Header styling */
-    .app-header {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 10px;
-        margin-bottom: 2rem;
-        text-align: center;
-        color: white;
-    }
-    
-    .app-title {
-        font-size: 3rem;
-        font-weight: bold;
-        margin-bottom: 0.5rem;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-    }
-    
-    .app-subtitle {
-        font-size: 1.2rem;
-        opacity: 0.9;
-        margin-bottom: 0;
-    }
-    
-    /* Card styling */
-    .info-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #667eea;
-        margin: 1rem 0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        color: #333;
-        line-height: 1.6;
-    }
-    
-    .success-card {
-        background: #d4edda;
-        border-left-color: #28a745;
-        color: #155724;
-    }
-
-    .warning-card {
-        background: #fff3cd;
-        border-left-color: #ffc107;
-        color: #856404;
-    }
+    # Style-only st.html content is applied without taking up layout space
+    st.html(_css_payload())
+
+_HEADER_HTML = """
+<div class="app-header fade-in">
+    <div class="app-title">🔊 SoundCheck</div>
+    <div class="app-subtitle">ML-Powered Hearing Test & Analysis</div>
+</div>
+"""
+_INFO_CARD_TMPL = '<div class="info-card {card_type}-card">{content}</div>'
+_METRIC_CARD_TMPL = """
+<div class="metric-container">
+    <div class="metric-value">{value}</div>
+    <div class="metric-label">{label}</div>
+</div>
+"""
 
-    .error-card {
-        background: #f8d7da;
-        border-left-color: #dc3545;
-        color: #721c24;
-    }
+@lru_cache(maxsize=128)
+def _progress_html(current: int, total: int) -> str:
+    percentage = (current / total) * 100
+    return f"""
+<div class="progress-container">
+    <div class="progress-bar" style="width: {percentage}%"></div>
+</div>
+<p style="text-align: center; margin-top: 0.5rem;">
+    Progress: {current}/{total} frequencies tested ({percentage:.0f}%)
+</p>
+"""
 
-    /* Recommendations styling */
-    .recommendations-card {
-        background: white;
-        border: 1px solid #e9ecef;
-        border-left: 4px solid #28a745;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-    }
+@lru_cache(maxsize=32)
+def _frequency_html(frequency: int) -> str:
+    return f'<div class="frequency-display pulse">{frequency} Hz</div>'
 
-    .recommendations-card ul {
-        margin: 0;
-        padding-left: 1.5rem;
-    }
+@lru_cache(maxsize=16)
+def _result_category_html(category: str) -> str:
+    return f'<div class="result-category category-{category.lower()} fade-in">{category} Hearing</div>'
 
-    .recommendations-card li {
-        margin-bottom: 0.8rem;
-        color: #333;
-        line-height: 1.6;
-        font-size: 1rem;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 25px;
-        padding: 0.5rem 2rem;
-        font-weight: bold;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 12px rgba(0,0,0,0.15);
-    }
-    
-    /* Audio button styling */
-    .audio-button {
-        background: linear-gradient(45deg, #ff6b6b, #ee5a24);
-        color: white;
-        border: none;
-        border-radius: 50px;
-        padding: 1rem 2rem;
-        font-size: 1.1rem;
-        font-weight: bold;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(255, 107, 107, 0.3);
-    }
-    
-    .audio-button:hover {
-        transform: scale(1.05);
-        box-shadow: 0 6px 20px rgba(255, 107, 107, 0.4);
-    }
-    
-    /* Progress bar styling */
-    .progress-container {
-        background: #e9ecef;
-        border-radius: 10px;
-        padding: 0.5rem;
-        margin: 1rem 0;
-    }
-    
-    .progress-bar {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        height: 20px;
-        border-radius: 10px;
-        transition: width 0.3s ease;
-    }
-    
-    /* Frequency display */
-    .frequency-display {
-        text-align: center;
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #667eea;
-        margin: 1rem 0;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-    }
+class HTMLBatch:
+    """Collects component HTML so consecutive helpers render as one element"""
     
-    /* Results styling */
-    .result-category {
-        text-align: center;
-        padding: 2rem;
-        border-radius: 15px;
-        margin: 1rem 0;
-        font-size: 1.5rem;
-        font-weight: bold;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    .category-normal {
-        background: linear-gradient(135deg, #28a745, #20c997);
-        color: white;
-    }
-    
-    .category-mild {
-        background: linear-gradient(135deg, #ffc107, #fd7e14);
-        color: #212529;
-    }
-    
-    .category-moderate {
-        background: linear-gradient(135deg, #fd7e14, #dc3545);
-        color: white;
-    }
-    
-    .category-severe {
-        background: linear-gradient(135deg, #dc3545, #6f42c1);
-        color: white;
-    }
-    
-    /* Sidebar styling */
-    .sidebar .sidebar-content {
-        background: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 100%);
-    }
-    
-    /* Metric styling */
-    .metric-container {
-        background: white;
-        padding: 1rem;
-        border-radius: 10px;
-        text-align: center;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-    }
-    
-    .metric-value {
-        font-size: 2rem;
-        font-weight: bold;
-        color: #667eea;
-    }
+    def __init__(self):
+        self.parts = []
     
-    .metric-label {
-        font-size: 0.9rem;
-        color: #6c757d;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    /* Animation classes */
-    .fade-in {
-        animation: fadeIn 0.5s ease-in;
-    }
-    
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
+    def add(self, html: str):
+        self.parts.append(html)
     
-    .pulse {
-        animation: pulse 2s infinite;
-    }
-    
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-        100% { transform: scale(1); }
-    }
-    
-    /* Responsive design */
-    @media (max-width: 768px) {
-        .app-title {
-            font-size: 2rem;
-        }
-        
-        .frequency-display {
-            font-size: 2rem;
-        }
-        
-        .result-category {
-            font-size: 1.2rem;
-            padding: 1.5rem;
-        }
-    }
-    
-    /* Hide Streamlit elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Custom scrollbar */
-    ::-webkit-scrollbar {
-        width: 8px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #f1f1f1;
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(180deg, #667eea, #764ba2);
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(180deg, #764ba2, #667eea);
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    def flush(self):
+        """Render everything collected so far in a single st.markdown call"""
+        if self.parts:
+            st.markdown("".join(self.parts), unsafe_allow_html=True)
+            self.parts = []
+
+def _render(html: str, batch: Optional[HTMLBatch]):
+    """Render now, or defer into the batch when one is given"""
+    if batch is None:
+        st.markdown(html, unsafe_allow_html=True)
+    else:
+        batch.add(html)
 
-def create_header():
+def create_header(batch: Optional[HTMLBatch] = None):
     """Create the app header"""
-    st.markdown("""
-    <div class="app-header fade-in">
-        <div class="app-title">🔊 SoundCheck</div>
-        <div class="app-subtitle">ML-Powered Hearing Test & Analysis</div>
-    </div>
-    """, unsafe_allow_html=True)
+    _render(_HEADER_HTML, batch)
 
-def create_info_card(content: str, card_type: str = "info"):
+def create_info_card(content: str, card_type: str = "info", batch: Optional[HTMLBatch] = None):
     """Create an information card"""
-    card_class = f"info-card {card_type}-card"
-    st.markdown(f"""
-    <div class="{card_class}">
-        {content}
-    </div>
-    """, unsafe_allow_html=True)
+    _render(_INFO_CARD_TMPL.format(card_type=card_type, content=content), batch)
 
-def create_metric_card(value: str, label: str):
+def create_metric_card(value: str, label: str, batch: Optional[HTMLBatch] = None):
     """Create a metric display card"""
-    st.markdown(f"""
-    <div class="metric-container">
-        <div class="metric-value">{value}</div>
-        <div class="metric-label">{label}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    _render(_METRIC_CARD_TMPL.format(value=value, label=label), batch)
 
-def create_progress_bar(current: int, total: int):
+def create_progress_bar(current: int, total: int, batch: Optional[HTMLBatch] = None):
     """Create a custom progress bar"""
-    percentage = (current / total) * 100
-    st.markdown(f"""
-    <div class="progress-container">
-        <div class="progress-bar" style="width: {percentage}%"></div>
-    </div>
-    <p style="text-align: center; margin-top: 0.5rem;">
-        Progress: {current}/{total} frequencies tested ({percentage:.0f}%)
-    </p>
-    """, unsafe_allow_html=True)
+    _render(_progress_html(current, total), batch)
 
-def create_frequency_display(frequency: int):
+def create_frequency_display(frequency: int, batch: Optional[HTMLBatch] = None):
     """Create a frequency display"""
-    st.markdown(f"""
-    <div class="frequency-display pulse">
-        {frequency} Hz
-    </div>
-    """, unsafe_allow_html=True)
+    _render(_frequency_html(frequency), batch)
 
-def create_result_category_display(category: str):
+def create_result_category_display(category: str, batch: Optional[HTMLBatch] = None):
     """Create a result category display"""
-    category_class = f"category-{category.lower()}"
-    st.markdown(f"""
-    <div class="result-category {category_class} fade-in">
-        {category} Hearing
-    </div>
-    """, unsafe_allow_html=True)
+    _render(_result_category_html(category), batch)
 
 # Color schemes
 COLORS = {
@@ -398,3 +183,8 @@ ICONS = {
     "brain": "🧠",
     "ear": "👂"
 }
+
+# Read-only views of the constant tables
+APP_CONFIG = MappingProxyType(APP_CONFIG)
+COLORS = MappingProxyType(COLORS)
+ICONS = MappingProxyType(ICONS)
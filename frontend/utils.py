@@ -4,69 +4,169 @@ Utility functions for the SoundCheck Streamlit Frontend
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
+import html
 import io
 import json
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from typing import Dict, List, Optional, Tuple, Any
+import socket
+import threading
+import wave
+import numpy as np
+from functools import lru_cache
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # API Configuration
 #API_BASE_URL = "http://localhost:8000"
 API_BASE_URL = "https://soundcheck-2qak.onrender.com"
 
+# (connect, read) timeouts in seconds: a dead host fails within the connect
+# timeout, while the read timeout allows for the work each endpoint does
+_TIMEOUTS = {
+    "fast": (2, 5),     # static data and health
+    "med": (2, 10),     # a single tone
+    "slow": (2, 15),    # test analysis
+    "batch": (2, 30),   # every test tone in one request
+}
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+def _loads(response: requests.Response) -> Dict[str, Any]:
+    """Parse a JSON response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_static(_session: requests.Session, url: str) -> Dict[str, Any]:
+    """GET an endpoint serving static data, at most once per URL every 5 minutes;
+    failures raise so they are not cached"""
+    response = _session.get(url, timeout=_TIMEOUTS["fast"])
+    response.raise_for_status()
+    return _loads(response)
+
 class APIClient:
     """Client for communicating with the SoundCheck backend API"""
     
     def __init__(self, base_url: str = API_BASE_URL):
         self.base_url = base_url
         self.session = requests.Session()
+        # Keep-alive pool sized for the concurrent tone prefetch threads, with
+        # brief retries while the hosted backend's proxy reports it unavailable;
+        # every endpoint is free of side effects, so POSTs are retried too
+        retries = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
+        # A local backend (uvicorn started next to the app) is probed before health
+        # checks; a remote one relies on the session's connect timeout instead
+        self.is_local = urlsplit(base_url).hostname in ("localhost", "127.0.0.1", "::1")
+    
+    def is_reachable(self, timeout: float = 0.5) -> bool:
+        """Probe the backend host with a bare TCP connect, without an HTTP request"""
+        url = urlsplit(self.base_url)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        try:
+            socket.create_connection((url.hostname, port), timeout=timeout).close()
+            return True
+        except OSError:
+            return False
     
     def health_check(self) -> Dict[str, Any]:
         """Check if the backend API is healthy"""
+        # Fail fast when nothing is listening locally instead of waiting out the HTTP timeout
+        if self.is_local and not self.is_reachable():
+            return {"status": "error", "message": f"Backend at {self.base_url} is unreachable"}
         try:
-            response = self.session.get(f"{self.base_url}/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/health", timeout=_TIMEOUTS["fast"])
             response.raise_for_status()
-            return response.json()
+            return _loads(response)
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the ML model"""
         try:
-            response = self.session.get(f"{self.base_url}/model/info", timeout=5)
-            response.raise_for_status()
-            return response.json()
+            return _get_static(self.session, f"{self.base_url}/model/info")
         except Exception as e:
             return {"error": str(e)}
     
     def generate_audio(self, frequency: int, duration: float = 1.0, 
                       volume: float = 0.5) -> Dict[str, Any]:
-        """Generate audio tone for hearing test"""
+        """Generate audio tone for hearing test; the sample rate is left to the backend,
+        which picks the lowest standard rate suited to the frequency"""
         try:
             payload = {
                 "frequency": frequency,
                 "duration": duration,
-                "volume": volume,
-                "sample_rate": 44100
+                "volume": volume
             }
             response = self.session.post(
                 f"{self.base_url}/audio/generate", 
-                json=payload, 
-                timeout=10
+                data=_dumps(payload), 
+                timeout=_TIMEOUTS["med"]
+            )
+            response.raise_for_status()
+            return _loads(response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def generate_audio_batch(self, frequencies: List[int], duration: float = 1.0,
+                             volume: float = 0.5) -> Dict[str, Any]:
+        """Generate the tones for several frequencies in one request"""
+        try:
+            payload = {
+                "tones": [
+                    {"frequency": frequency, "duration": duration, "volume": volume}
+                    for frequency in frequencies
+                ]
+            }
+            response = self.session.post(
+                f"{self.base_url}/audio/generate/batch",
+                data=_dumps(payload),
+                timeout=_TIMEOUTS["batch"]
             )
             response.raise_for_status()
-            return response.json()
+            return _loads(response)
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def generate_audio_many(self, frequencies: List[int], duration: float = 1.0,
+                            volume: float = 0.5) -> List[Dict[str, Any]]:
+        """Generate the tones for several frequencies as concurrent single requests
+        over the pooled session, for backends without the batch route"""
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(frequencies)))) as executor:
+            return list(executor.map(
+                lambda frequency: self.generate_audio(frequency, duration=duration, volume=volume),
+                frequencies
+            ))
+    
     def analyze_hearing_test(self, user_info: Dict[str, Any], 
                            frequency_responses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze hearing test results"""
@@ -78,53 +178,90 @@ class APIClient:
             }
             response = self.session.post(
                 f"{self.base_url}/test/analyze", 
-                json=payload, 
-                timeout=15
+                data=_dumps(payload), 
+                timeout=_TIMEOUTS["slow"]
             )
             response.raise_for_status()
-            return response.json()
+            return _loads(response)
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def get_test_frequencies(self) -> Dict[str, Any]:
         """Get standard test frequencies"""
         try:
-            response = self.session.get(f"{self.base_url}/test/frequencies", timeout=5)
-            response.raise_for_status()
-            return response.json()
+            return _get_static(self.session, f"{self.base_url}/test/frequencies")
         except Exception as e:
             return {"error": str(e)}
     
     def get_hearing_categories(self) -> Dict[str, Any]:
         """Get hearing loss categories"""
         try:
-            response = self.session.get(f"{self.base_url}/categories", timeout=5)
-            response.raise_for_status()
-            return response.json()
+            return _get_static(self.session, f"{self.base_url}/categories")
         except Exception as e:
             return {"error": str(e)}
 
+@st.cache_resource
+def get_api_client(base_url: str = API_BASE_URL) -> APIClient:
+    """Process-wide API client, so its keep-alive pool survives reruns and is shared across sessions"""
+    return APIClient(base_url)
+
+# Onset/offset taper of synthesized tones, the same raised-cosine ramp as the backend
+TONE_RAMP_MS = 5.0
+
+@lru_cache(maxsize=64)
+def synthesize_tone(frequency: int, duration: float = 1.0, volume: float = 0.5,
+                    sample_rate: int = 44100) -> bytes:
+    """Synthesize a ramped sine tone as mono 16-bit WAV bytes, matching the backend's
+    /audio/generate output, without a network round trip"""
+    n = int(duration * sample_rate)
+    samples = np.sin((2 * np.pi * frequency / sample_rate) * np.arange(n))
+    samples *= volume * 32767
+    ramp_len = min(int(sample_rate * TONE_RAMP_MS / 1000), n // 2)
+    if ramp_len > 0:
+        ramp = 0.5 - 0.5 * np.cos(np.pi * np.arange(ramp_len) / ramp_len)
+        samples[:ramp_len] *= ramp
+        samples[n - ramp_len:] *= ramp[::-1]
+    
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
 class AudioPlayer:
     """Handles audio playback in Streamlit"""
     
+    @staticmethod
+    def play_audio_bytes(audio_bytes: bytes, autoplay: bool = False) -> None:
+        """Play decoded WAV bytes; Streamlit serves them from a content-hashed media URL"""
+        try:
+            st.audio(audio_bytes, format='audio/wav', autoplay=autoplay)
+        except Exception as e:
+            st.error(f"Error playing audio: {e}")
+    
     @staticmethod
     def play_audio_from_base64(audio_data: str, autoplay: bool = False) -> None:
         """Play audio from base64 data"""
         try:
-            import base64
             # Decode base64 to bytes
             audio_bytes = base64.b64decode(audio_data)
-            # Use Streamlit's native audio component
-            st.audio(audio_bytes, format='audio/wav', autoplay=autoplay)
         except Exception as e:
             st.error(f"Error playing audio: {e}")
+            return
+        AudioPlayer.play_audio_bytes(audio_bytes, autoplay=autoplay)
     
     @staticmethod
-    def create_audio_button(frequency: int, api_client: APIClient) -> bool:
-        """Create a button that plays audio when clicked"""
+    def create_audio_button(frequency: int, api_client: Optional[APIClient] = None) -> bool:
+        """Create a button that plays audio when clicked; without an API client the
+        tone is synthesized in-process and played as raw bytes"""
         button_key = f"play_{frequency}hz"
         
         if st.button(f"🔊 Play {frequency} Hz", key=button_key, use_container_width=True):
+            if api_client is None:
+                AudioPlayer.play_audio_bytes(synthesize_tone(frequency), autoplay=True)
+                return True
             with st.spinner(f"Generating {frequency} Hz tone..."):
                 audio_response = api_client.generate_audio(frequency)
                 
@@ -139,29 +276,59 @@ class AudioPlayer:
                     return False
         return False
 
+# Dark chart theme shared by the result charts, so each figure only carries its
+# own overrides
+_AXIS_STYLE = dict(
+    gridcolor='rgba(255,255,255,0.1)',
+    tickfont=dict(size=12, color='white'),
+    title_font=dict(size=14, color='white')
+)
+
+_go = None
+
+def _plotly():
+    """plotly.graph_objects, imported on the first chart rather than at app start
+    and with the soundcheck_dark template registered"""
+    global _go
+    if _go is None:
+        import plotly.graph_objects as go
+        import plotly.io as pio
+        template = go.layout.Template(pio.templates["plotly_dark"])
+        template.layout.update(
+            title=dict(font=dict(size=22, color='white', family='Arial Black'), x=0.5, y=0.95),
+            xaxis=_AXIS_STYLE,
+            yaxis=_AXIS_STYLE,
+            height=450,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=80, b=60, l=60, r=40),
+            legend=dict(
+                font=dict(color='white', size=12),
+                bgcolor='rgba(0,0,0,0.5)',
+                bordercolor='rgba(255,255,255,0.3)',
+                borderwidth=1
+            )
+        )
+        pio.templates["soundcheck_dark"] = template
+        _go = go
+    return _go
+
 class DataVisualizer:
     """Creates visualizations for hearing test results"""
     
     @staticmethod
-    def create_audiogram(frequency_responses: List[Dict[str, Any]], 
-                        predicted_thresholds: Optional[Dict[str, float]] = None) -> go.Figure:
+    @st.cache_data(max_entries=16, show_spinner=False)
+    def create_audiogram(frequency_responses: Dict[int, bool], 
+                        predicted_thresholds: Optional[Dict[str, float]] = None) -> "go.Figure":
         """Create an audiogram visualization"""
-        frequencies = [r["frequency"] for r in frequency_responses]
-        heard_status = [r["heard"] for r in frequency_responses]
+        go = _plotly()
+        n = len(frequency_responses)
+        frequencies = np.fromiter(frequency_responses.keys(), dtype=np.int32, count=n)
+        heard = np.fromiter(frequency_responses.values(), dtype=bool, count=n)
         
-        # Estimate thresholds based on responses
-        thresholds = []
-        for response in frequency_responses:
-            if response["heard"]:
-                thresholds.append(20)  # Normal hearing
-            else:
-                # Estimate based on frequency
-                if response["frequency"] <= 1000:
-                    thresholds.append(35)
-                elif response["frequency"] <= 4000:
-                    thresholds.append(40)
-                else:
-                    thresholds.append(45)
+        # Estimate thresholds: normal hearing if heard, otherwise by frequency band
+        thresholds = np.where(heard, 20, np.select([frequencies <= 1000, frequencies <= 4000],
+                                                   [35, 40], default=45))
         
         # Create the plot
         fig = go.Figure()
@@ -182,57 +349,33 @@ class DataVisualizer:
         
         # Customize layout
         fig.update_layout(
-            title=dict(
-                text="🎧 Hearing Test Results - Audiogram",
-                font=dict(size=22, color='white', family='Arial Black'),
-                x=0.5,
-                y=0.95
-            ),
+            title_text="🎧 Hearing Test Results - Audiogram",
             xaxis_title="Frequency (Hz)",
             yaxis_title="Hearing Threshold (dB HL)",
-            yaxis=dict(
-                autorange="reversed",  # Invert y-axis (audiogram convention)
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(size=12, color='white'),
-                title_font=dict(size=14, color='white')
-            ),
-            xaxis=dict(
-                type="log",  # Log scale for frequencies
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(size=12, color='white'),
-                title_font=dict(size=14, color='white')
-            ),
-            template="plotly_dark",
-            height=450,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            margin=dict(t=80, b=60, l=60, r=40),
-            showlegend=True,
-            legend=dict(
-                font=dict(color='white', size=12),
-                bgcolor='rgba(0,0,0,0.5)',
-                bordercolor='rgba(255,255,255,0.3)',
-                borderwidth=1
-            )
+            yaxis_autorange="reversed",  # Invert y-axis (audiogram convention)
+            xaxis_type="log",  # Log scale for frequencies
+            template="soundcheck_dark",
+            showlegend=True
         )
         
         return fig
     
     @staticmethod
-    def create_frequency_response_chart(frequency_responses: List[Dict[str, Any]]) -> go.Figure:
+    @st.cache_data(max_entries=16, show_spinner=False)
+    def create_frequency_response_chart(frequency_responses: Dict[int, bool]) -> "go.Figure":
         """Create a frequency response chart"""
+        go = _plotly()
         if not frequency_responses:
             # Return empty chart if no data
             fig = go.Figure()
             fig.update_layout(
                 title="No data available",
-                template="plotly_dark",
-                height=450
+                template="soundcheck_dark"
             )
             return fig
 
-        frequencies = [r["frequency"] for r in frequency_responses]
-        heard = [1 if r["heard"] else 0 for r in frequency_responses]
+        frequencies = list(frequency_responses)
+        heard = [1 if h else 0 for h in frequency_responses.values()]
         colors = ['#28a745' if h else '#dc3545' for h in heard]
         
         fig = go.Figure()
@@ -254,40 +397,26 @@ class DataVisualizer:
         ))
 
         fig.update_layout(
-            title=dict(
-                text="🎵 Frequency Response Summary",
-                font=dict(size=22, color='white', family='Arial Black'),
-                x=0.5,
-                y=0.95
-            ),
+            title_text="🎵 Frequency Response Summary",
             xaxis_title="Frequency (Hz)",
             yaxis_title="Response",
             yaxis=dict(
                 tickvals=[0, 1],
                 ticktext=['Not Heard', 'Heard'],
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(size=12, color='white'),
                 range=[-0.1, 1.1]  # Ensure proper range
             ),
-            xaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(size=12, color='white'),
-                title_font=dict(size=14, color='white'),
-                type='category'  # Ensure frequencies are treated as categories
-            ),
-            template="plotly_dark",
-            height=450,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            margin=dict(t=80, b=60, l=60, r=40),
+            xaxis_type='category',  # Ensure frequencies are treated as categories
+            template="soundcheck_dark",
             showlegend=False
         )
         
         return fig
     
     @staticmethod
-    def create_risk_gauge(risk_level: str, confidence: float) -> go.Figure:
+    @st.cache_data(max_entries=16, show_spinner=False)
+    def create_risk_gauge(risk_level: str, confidence: float) -> "go.Figure":
         """Create a risk level gauge"""
+        go = _plotly()
         risk_values = {"Low": 1, "Medium": 2, "High": 3}
         risk_colors = {"Low": "green", "Medium": "yellow", "High": "red"}
         
@@ -331,7 +460,10 @@ class SessionManager:
             st.session_state.current_frequency_index = 0
         
         if 'frequency_responses' not in st.session_state:
-            st.session_state.frequency_responses = []
+            st.session_state.frequency_responses = {}
+        
+        if 'heard_count' not in st.session_state:
+            st.session_state.heard_count = 0
         
         if 'test_completed' not in st.session_state:
             st.session_state.test_completed = False
@@ -341,13 +473,20 @@ class SessionManager:
         
         if 'user_info' not in st.session_state:
             st.session_state.user_info = {}
+        
+        if 'warmed' not in st.session_state:
+            # Resolve DNS and open the pooled HTTPS connection (waking a sleeping
+            # backend) in the background while the first page renders
+            threading.Thread(target=lambda: get_api_client().health_check(), daemon=True).start()
+            st.session_state.warmed = True
     
     @staticmethod
     def reset_test():
         """Reset the hearing test"""
         st.session_state.test_started = False
         st.session_state.current_frequency_index = 0
-        st.session_state.frequency_responses = []
+        st.session_state.frequency_responses = {}
+        st.session_state.heard_count = 0
         st.session_state.test_completed = False
         st.session_state.test_results = None
         # Clear audio played tracking
@@ -356,43 +495,40 @@ class SessionManager:
     
     @staticmethod
     def save_response(frequency: int, heard: bool):
-        """Save a frequency response"""
-        response = {"frequency": frequency, "heard": heard}
-        
-        # Check if response already exists for this frequency
-        existing_index = None
-        for i, r in enumerate(st.session_state.frequency_responses):
-            if r["frequency"] == frequency:
-                existing_index = i
-                break
+        """Save a frequency response; responses are keyed by frequency in answer order"""
+        # Replacing an answer, drop the old one from the running count
+        if st.session_state.frequency_responses.get(frequency):
+            st.session_state.heard_count -= 1
+        st.session_state.frequency_responses[frequency] = heard
         
-        if existing_index is not None:
-            st.session_state.frequency_responses[existing_index] = response
-        else:
-            st.session_state.frequency_responses.append(response)
+        if heard:
+            st.session_state.heard_count += 1
 
 def format_recommendations(recommendations: List[str]) -> str:
     """Format recommendations as HTML with better visibility"""
     if not recommendations:
         return "<p style='color: #6c757d; font-style: italic;'>No specific recommendations available.</p>"
 
-    formatted = "<div style='background: white; padding: 1rem; border-radius: 8px;'><ul style='margin: 0; padding-left: 1.5rem;'>"
-    for rec in recommendations:
-        formatted += f"<li style='margin-bottom: 0.5rem; color: #333; line-height: 1.5;'>{rec}</li>"
-    formatted += "</ul></div>"
+    items = "".join(
+        f"<li style='margin-bottom: 0.5rem; color: #333; line-height: 1.5;'>{html.escape(rec)}</li>"
+        for rec in recommendations
+    )
+    return ("<div style='background: white; padding: 1rem; border-radius: 8px;'>"
+            f"<ul style='margin: 0; padding-left: 1.5rem;'>{items}</ul></div>")
 
-    return formatted
+# Hearing category colors, built once at import
+_CATEGORY_COLORS = {
+    "Normal": "#28a745",      # Green
+    "Mild": "#ffc107",        # Yellow
+    "Moderate": "#fd7e14",    # Orange
+    "Severe": "#dc3545",      # Red
+    "Profound": "#6f42c1"     # Purple
+}
+_DEFAULT_CATEGORY_COLOR = "#6c757d"  # Gray
 
 def get_category_color(category: str) -> str:
     """Get color for hearing category"""
-    colors = {
-        "Normal": "#28a745",      # Green
-        "Mild": "#ffc107",        # Yellow
-        "Moderate": "#fd7e14",    # Orange
-        "Severe": "#dc3545",      # Red
-        "Profound": "#6f42c1"     # Purple
-    }
-    return colors.get(category, "#6c757d")  # Default gray
+    return _CATEGORY_COLORS.get(category, _DEFAULT_CATEGORY_COLOR)
 
 def format_confidence(confidence: float) -> str:
     """Format confidence score as percentage"""